@@ -0,0 +1,697 @@
+#!/usr/bin/env python3
+"""
+Performance benchmarks for the Eero Dashboard
+Runs the hot paths of dashboard.py against synthetic data and prints timings
+"""
+
+import gc
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import platform
+import statistics
+import subprocess
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import dashboard
+import eero_fixtures
+
+HISTORY_FILE = dashboard.LOCAL_DIR / "benchmark_history.jsonl"
+REGRESSION_THRESHOLD = 0.2  # flag medians more than 20% slower than the previous run
+
+# Median timings recorded by report(), keyed "<benchmark>/<label>"
+results = {}
+current_benchmark = None
+
+# Payload scale for the fixture benchmarks, overridable from the command line
+scale = {'networks': 4, 'devices': 500, 'aps': 16}
+
+def time_call(func, repeat=20):
+    """Run func repeatedly and return per-call timings in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+def report(label, timings, extra=''):
+    """Print median/min/max for a list of timings and record the median"""
+    results[f"{current_benchmark}/{label}"] = round(statistics.median(timings), 3)
+    print(f"  {label}: median {statistics.median(timings):.2f} ms, "
+          f"min {min(timings):.2f} ms, max {max(timings):.2f} ms{extra}")
+
+def make_presence_devices(count, networks=4, seed=42):
+    """Build (mac, network_id, signal_dbm) tuples for the presence tracker"""
+    rng = random.Random(seed)
+    return [(f"02:00:{i >> 24 & 0xff:02x}:{i >> 16 & 0xff:02x}:{i >> 8 & 0xff:02x}:{i & 0xff:02x}",
+             f"net{i % networks}",
+             rng.randint(-90, -35) if i % 5 else None)
+            for i in range(count)]
+
+def bench_presence_tracker(device_count=5000, snapshots=50):
+    """Benchmark PresenceTracker.update() per snapshot with device churn"""
+    print(f"\n📡 Presence tracker: {device_count} devices, {snapshots} snapshots")
+    rng = random.Random(7)
+    population = make_presence_devices(device_count * 2)
+    networks = {f"net{i}" for i in range(4)}
+
+    tracemalloc.start()
+    tracker = dashboard.PresenceTracker(max_devices=device_count * 2)
+    preallocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # ~5% of devices change between snapshots
+    online = population[:device_count]
+    timings = []
+    ts = time.time()
+    for _ in range(snapshots):
+        swap = rng.sample(range(len(online)), device_count // 20)
+        for index in swap:
+            online[index] = population[rng.randrange(len(population))]
+        ts += 60
+        started = time.perf_counter()
+        tracker.update(ts, online, networks)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    report("update per snapshot", timings,
+           f", {statistics.median(timings) * 1000 / device_count:.2f} µs/device")
+    print(f"  memory: {preallocated / 1024 / 1024:.1f} MB preallocated for {tracker.max_devices} slots, "
+          f"{tracker.stats()['tracked_devices']} devices tracked")
+
+    tracker.history(online[1][0])  # warm up timezone lookup
+    started = time.perf_counter()
+    history = tracker.history(online[1][0])
+    print(f"  history lookup: {(time.perf_counter() - started) * 1000:.3f} ms "
+          f"({len(history['rssi']) if history else 0} RSSI samples)")
+    return True
+
+def make_ap_topology(ap_count, seed=42):
+    """Build ap_data and bssid_to_ap shaped like update_cache() builds them"""
+    rng = random.Random(seed)
+    ap_data = {}
+    bssid_to_ap = {}
+    for i in range(ap_count):
+        ap_id = f"/2.2/eeros/{10000000 + i}"
+        location = f"Room {i}"
+        ap_data[ap_id] = {
+            'name': f"eero Pro 6E ({location})" if rng.random() < 0.8 else f"eero Pro 6E (...{i:04d})",
+            'model': 'eero Pro 6E',
+            'location': location,
+            'devices_by_freq': {'2.4GHz': 0, '5GHz': 0, '6GHz': 0},
+            'total_devices': 0
+        }
+        for band in range(3):
+            bssid_to_ap[f"00:11:{i >> 8 & 0xff:02x}:{i & 0xff:02x}:{band:02x}:01"] = ap_id
+    return ap_data, bssid_to_ap
+
+def make_assignment_devices(count, ap_count, seed=42):
+    """Build wireless devices reporting their AP in the different ways the API does"""
+    rng = random.Random(seed)
+    devices = []
+    for i in range(count):
+        ap = rng.randrange(ap_count)
+        device = {'mac': f"02:00:00:00:{i >> 8 & 0xff:02x}:{i & 0xff:02x}", 'wireless': True}
+        interface = {'frequency': rng.choice(['2.4', '5.2', '6.1'])}
+        kind = rng.random()
+        if kind < 0.5:
+            device['source'] = {'location': f"Room {ap}", 'url': f"/2.2/eeros/{10000000 + ap}"}
+        elif kind < 0.65:
+            device['source'] = {'location': f"Annex {ap}"}  # matches no AP name
+            interface['bssid'] = f"00:11:{ap >> 8 & 0xff:02x}:{ap & 0xff:02x}:00:01"
+        elif kind < 0.8:
+            interface['eero_url'] = f"/2.2/eeros/{10000000 + ap}"
+        elif kind < 0.95:
+            interface['bssid'] = f"00:11:{ap >> 8 & 0xff:02X}:{ap & 0xff:02X}:01:01"
+        device['interface'] = interface
+        devices.append(device)
+    return devices
+
+def legacy_assign(devices, ap_data, bssid_to_ap):
+    """The AP assignment loop update_cache() used before APIndex"""
+    assignments = {}
+    for device in devices:
+        interface_info = device.get('interface', {})
+        connected_ap = None
+        device_source = device.get('source', {})
+        if device_source and isinstance(device_source, dict):
+            source_location = device_source.get('location', '')
+            source_url = device_source.get('url', '')
+            if source_location or source_url:
+                for ap_id, ap_info in ap_data.items():
+                    if source_location and source_location.lower() in ap_info['name'].lower():
+                        connected_ap = ap_id
+                        break
+                    elif source_url and source_url == ap_id:
+                        connected_ap = ap_id
+                        break
+        if not connected_ap:
+            eero_url = interface_info.get('eero_url') or interface_info.get('eero')
+            if eero_url and eero_url in ap_data:
+                connected_ap = eero_url
+        if not connected_ap:
+            bssid = interface_info.get('bssid', '').lower()
+            if bssid and bssid in bssid_to_ap:
+                connected_ap = bssid_to_ap[bssid]
+        if not connected_ap:
+            for field in ['ap_mac', 'access_point', 'connected_eero', 'parent_eero']:
+                if field in interface_info:
+                    field_value = str(interface_info[field]).lower()
+                    if field_value in bssid_to_ap:
+                        connected_ap = bssid_to_ap[field_value]
+                        break
+        assignments[device['mac']] = connected_ap
+    return assignments
+
+def indexed_assign(devices, ap_data, bssid_to_ap):
+    """AP assignment through a freshly built APIndex, as on a topology change"""
+    ap_index = dashboard.APIndex(ap_data, bssid_to_ap)
+    return {device['mac']: ap_index.match(device, device.get('interface', {}))[0]
+            for device in devices}
+
+def bench_ap_assignment(device_count=5000, ap_count=200):
+    """Benchmark legacy vs indexed AP assignment"""
+    print(f"\n📶 AP assignment: {device_count} devices × {ap_count} APs")
+    ap_data, bssid_to_ap = make_ap_topology(ap_count)
+    devices = make_assignment_devices(device_count, ap_count)
+
+    expected = legacy_assign(devices, ap_data, bssid_to_ap)
+    actual = indexed_assign(devices, ap_data, bssid_to_ap)
+    mismatches = sum(1 for mac in expected if expected[mac] != actual[mac])
+    assigned = sum(1 for ap_id in expected.values() if ap_id)
+    print(f"  {assigned}/{device_count} assigned, {mismatches} mismatches")
+
+    legacy = time_call(lambda: legacy_assign(devices, ap_data, bssid_to_ap), repeat=5)
+    indexed = time_call(lambda: indexed_assign(devices, ap_data, bssid_to_ap))
+    report("legacy loop", legacy)
+    report("indexed", indexed)
+    print(f"  speedup: {statistics.median(legacy) / statistics.median(indexed):.0f}x")
+    return mismatches == 0
+
+def legacy_detect_device_os(device):
+    """detect_device_os() as it was before DeviceOSClassifier"""
+    manufacturer = str(device.get('manufacturer', '')).lower()
+    hostname = str(device.get('hostname', '')).lower()
+    text = manufacturer + " " + hostname
+    if any(k in manufacturer for k in ['amazon', 'amazon technologies']):
+        return 'Amazon'
+    elif any(k in text for k in ['echo', 'alexa', 'fire tv', 'kindle']):
+        return 'Amazon'
+    elif any(k in manufacturer for k in ['apple', 'apple inc']):
+        return 'iOS'
+    elif any(k in text for k in ['iphone', 'ipad', 'mac', 'ios', 'apple']):
+        return 'iOS'
+    elif any(k in manufacturer for k in ['samsung', 'google', 'lg electronics', 'htc', 'sony', 'motorola', 'huawei', 'xiaomi', 'oneplus']):
+        return 'Android'
+    elif any(k in text for k in ['android', 'pixel', 'galaxy']):
+        return 'Android'
+    elif any(k in manufacturer for k in ['microsoft', 'dell', 'hp', 'lenovo', 'asus', 'acer', 'msi']):
+        return 'Windows'
+    elif any(k in text for k in ['windows', 'microsoft', 'surface']):
+        return 'Windows'
+    elif any(k in manufacturer for k in ['sony computer entertainment', 'nintendo']):
+        return 'Gaming'
+    elif any(k in text for k in ['playstation', 'xbox', 'nintendo', 'steam deck']):
+        return 'Gaming'
+    elif any(k in manufacturer for k in ['roku', 'nvidia', 'chromecast']):
+        return 'Streaming'
+    elif any(k in text for k in ['roku', 'chromecast', 'nvidia shield', 'apple tv']):
+        return 'Streaming'
+    else:
+        return 'Other'
+
+OS_SAMPLE_WORDS = [
+    'Amazon Technologies Inc.', 'Apple, Inc.', 'Samsung Electronics', 'Google', 'LG Electronics',
+    'Sony Computer Entertainment', 'Sony', 'Nintendo Co.', 'Roku, Inc.', 'NVIDIA', 'Dell Inc.',
+    'Hewlett Packard', 'Microsoft', 'Espressif', 'Raspberry Pi', 'Tp-Link', 'Echo-Dot', 'Fire TV Stick',
+    'Kindle', 'iPhone', 'iPad', 'MacBook-Pro', 'Apple TV', 'Galaxy-S21', 'Pixel-7', 'android-1a2b',
+    'DESKTOP-WINDOWS', 'Surface-Go', 'PlayStation 5', 'XBOX', 'Steam Deck', 'Chromecast',
+    'NVIDIA Shield', 'ring-doorbell', 'thermostat', 'printer', 'Living Room', 'hp-laserjet', ''
+]
+
+def make_os_devices(count, seed=42):
+    """Build devices with realistic and adversarial manufacturer/hostname pairs"""
+    rng = random.Random(seed)
+    devices = []
+    for i in range(count):
+        device = {}
+        if rng.random() < 0.95:
+            device['manufacturer'] = rng.choice(OS_SAMPLE_WORDS + [None])
+        if rng.random() < 0.95:
+            hostname = rng.choice(OS_SAMPLE_WORDS + [None])
+            if hostname and rng.random() < 0.5:
+                hostname = f"{hostname}-{rng.randrange(1000)}"
+            device['hostname'] = hostname
+        devices.append(device)
+    return devices
+
+def bench_device_os(device_count=5000):
+    """Check DeviceOSClassifier against the legacy function and benchmark both"""
+    print(f"\n🏷️  Device OS classifier: {device_count} devices")
+    devices = make_os_devices(device_count)
+    exhaustive = [{'manufacturer': m, 'hostname': h} for m in OS_SAMPLE_WORDS + [None] for h in OS_SAMPLE_WORDS + [None]]
+
+    classifier = dashboard.DeviceOSClassifier()
+    def classify(device):
+        return classifier.classify(str(device.get('manufacturer', '')).lower(),
+                                   str(device.get('hostname', '')).lower())
+    mismatches = [device for device in devices + exhaustive
+                  if classify(device) != legacy_detect_device_os(device)]
+    print(f"  {len(devices) + len(exhaustive)} devices checked, {len(mismatches)} mismatches")
+    for device in mismatches[:5]:
+        print(f"    {device}: {classify(device)} != {legacy_detect_device_os(device)}")
+
+    legacy = time_call(lambda: [legacy_detect_device_os(device) for device in devices])
+    cold = time_call(lambda: (classifier.classify.cache_clear(), [classify(device) for device in devices]))
+    warm = time_call(lambda: [classify(device) for device in devices])
+    report("legacy", legacy)
+    report("compiled, cold cache", cold)
+    report("compiled, warm cache", warm, f", {classifier.stats()['cache_entries']} cached")
+    return not mismatches
+
+def make_pipeline_devices(count, ap_count, seed=42):
+    """Build connected devices as the eero API returns them, ~15% wired"""
+    rng = random.Random(seed)
+    devices = make_assignment_devices(count, ap_count, seed)
+    for device, os_device in zip(devices, make_os_devices(count, seed)):
+        device.update(os_device)
+        device['connected'] = True
+        device['ips'] = [f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}"]
+        if rng.random() < 0.15:
+            device['wireless'] = False
+            device.pop('interface', None)
+            device.pop('source', None)
+        else:
+            device['interface']['signal_dbm'] = rng.choice([rng.randint(-90, -35), f"{rng.randint(-90, -35)}", None])
+    return devices
+
+def legacy_process_devices(network, connected_devices, ap_data, ap_index):
+    """update_cache()'s per-device passes as they were before process_network_devices()"""
+    network_id = network.get('id')
+    network_device_list = []
+    network_os_counts = {'iOS': 0, 'Android': 0, 'Windows': 0, 'Amazon': 0, 'Gaming': 0, 'Streaming': 0, 'Other': 0}
+    network_freq_counts = {'2.4GHz': 0, '5GHz': 0, '6GHz': 0}
+    network_signal_values = []
+    wireless_devices = [d for d in connected_devices if d.get('wireless')]
+    for device in connected_devices:
+        device_os = dashboard.detect_device_os(device)
+        network_os_counts[device_os] += 1
+        is_wireless = device.get('wireless', False)
+        interface_info = device.get('interface', {}) if is_wireless else {}
+        if is_wireless:
+            freq_display, freq_band = dashboard.parse_frequency(interface_info)
+            if freq_band in network_freq_counts:
+                network_freq_counts[freq_band] += 1
+            signal_dbm = interface_info.get('signal_dbm', 'N/A')
+            signal_percent = dashboard.convert_signal_dbm_to_percent(signal_dbm)
+            signal_quality = dashboard.get_signal_quality(signal_dbm)
+            if signal_dbm != 'N/A' and signal_dbm is not None:
+                try:
+                    if isinstance(signal_dbm, (int, float)):
+                        signal_val = float(signal_dbm)
+                    else:
+                        signal_val = float(str(signal_dbm).replace(' dBm', '').replace('dBm', '').strip())
+                    if -100 <= signal_val <= -10:
+                        network_signal_values.append(signal_val)
+                except (ValueError, TypeError):
+                    pass
+        else:
+            freq_display = 'Wired'
+            freq_band = 'Wired'
+            signal_dbm = 'N/A'
+            signal_percent = 100
+            signal_quality = 'Wired'
+        network_device_list.append({
+            'name': device.get('nickname') or device.get('hostname') or 'Unknown Device',
+            'ip': ', '.join(device.get('ips', [])) if device.get('ips') else 'N/A',
+            'mac': device.get('mac', 'N/A'),
+            'manufacturer': device.get('manufacturer', 'Unknown'),
+            'device_os': device_os,
+            'connection_type': 'Wireless' if is_wireless else 'Wired',
+            'frequency': freq_display,
+            'frequency_band': freq_band,
+            'signal_avg_dbm': str(signal_dbm) + " dBm" if signal_dbm != 'N/A' else 'N/A',
+            'signal_avg': signal_percent,
+            'signal_quality': signal_quality,
+            'network_id': network_id,
+            'network_name': network.get('name', f'Network {network_id}')
+        })
+    assigned_devices = 0
+    unassigned_devices = 0
+    device_aps = {}
+    for device in connected_devices:
+        if not device.get('wireless'):
+            continue
+        interface_info = device.get('interface', {})
+        freq_display, freq_band = dashboard.parse_frequency(interface_info)
+        connected_ap, method = ap_index.match(device, interface_info)
+        if connected_ap and freq_band in ap_data[connected_ap]['devices_by_freq']:
+            ap_data[connected_ap]['devices_by_freq'][freq_band] += 1
+            ap_data[connected_ap]['total_devices'] += 1
+            assigned_devices += 1
+            device_aps[device.get('mac', 'N/A')] = connected_ap
+        else:
+            unassigned_devices += 1
+    for device_info in network_device_list:
+        ap_id = device_aps.get(device_info['mac'])
+        device_info['ap_id'] = ap_id
+        device_info['ap_name'] = ap_data[ap_id]['name'] if ap_id else None
+    device_counts_by_freq = {'2.4GHz': 0, '5GHz': 0, '6GHz': 0}
+    for device in connected_devices:
+        if not device.get('wireless'):
+            continue
+        interface_info = device.get('interface', {})
+        freq_display, freq_band = dashboard.parse_frequency(interface_info)
+        if freq_band in device_counts_by_freq:
+            device_counts_by_freq[freq_band] += 1
+    combined_wireless = len([d for d in network_device_list if d['connection_type'] == 'Wireless'])
+    return {
+        'devices': network_device_list,
+        'os_counts': network_os_counts,
+        'freq_counts': network_freq_counts,
+        'signal_values': network_signal_values,
+        'wireless_devices': len(wireless_devices),
+        'assigned': assigned_devices,
+        'unassigned': unassigned_devices,
+        'capacity_counts': device_counts_by_freq,
+        'combined_wireless': combined_wireless
+    }
+
+def bench_device_pipeline(device_count=5000, ap_count=200, repeat=10):
+    """Benchmark update_cache()'s per-device processing, old passes vs single pass"""
+    print(f"\n🔁 Device pipeline: {device_count} devices, {ap_count} APs")
+    network = {'id': 'bench', 'name': 'Benchmark Network'}
+    devices = make_pipeline_devices(device_count, ap_count)
+    ap_data, bssid_to_ap = make_ap_topology(ap_count)
+    ap_index = dashboard.APIndex(ap_data, bssid_to_ap)
+
+    def run(process):
+        # Every run gets fresh AP counters, built outside the timed section
+        timings = []
+        for _ in range(repeat):
+            fresh = make_ap_topology(ap_count)[0]
+            started = time.perf_counter()
+            result = process(network, devices, fresh, ap_index)
+            timings.append((time.perf_counter() - started) * 1000)
+        return timings, result, fresh
+
+    legacy_timings, expected, expected_aps = run(legacy_process_devices)
+    single_timings, actual, actual_aps = run(dashboard.process_network_devices)
+    keys = ('devices', 'os_counts', 'freq_counts', 'signal_values', 'wireless_devices', 'assigned', 'unassigned')
+    actual = dict(actual, devices=actual['devices'].to_list())
+    differences = [key for key in keys if expected[key] != actual[key]]
+    if expected_aps != actual_aps:
+        differences.append('ap_data')
+    if expected['capacity_counts'] != actual['freq_counts'] or expected['combined_wireless'] != actual['wireless_devices']:
+        differences.append('capacity/wireless counts')
+    print(f"  outputs {'identical' if not differences else 'differ: ' + ', '.join(differences)}")
+
+    report("legacy passes", legacy_timings)
+    report("single pass", single_timings)
+    print(f"  reduction: {100 * (1 - statistics.median(single_timings) / statistics.median(legacy_timings)):.0f}%")
+    return not differences
+
+def gc_collections():
+    return sum(generation['collections'] for generation in gc.get_stats())
+
+def measure_retained(build):
+    """Get (result, bytes retained, blocks retained, GC-tracked objects added, collections run)"""
+    gc.collect()
+    tracked_before = len(gc.get_objects())
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    blocks_before = sum(stat.count for stat in tracemalloc.take_snapshot().statistics('filename'))
+    collections_before = gc_collections()
+    result = build()
+    collections = gc_collections() - collections_before
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    blocks_after = sum(stat.count for stat in tracemalloc.take_snapshot().statistics('filename'))
+    tracemalloc.stop()
+    return result, after - before, blocks_after - blocks_before, len(gc.get_objects()) - tracked_before, collections
+
+def bench_device_records(device_count=5000, ap_count=200):
+    """Compare memory, GC load and serialization of device dicts vs device rows"""
+    print(f"\n🧱 Device rows: {device_count} devices")
+    network = {'id': 'bench', 'name': 'Benchmark Network'}
+    devices = make_pipeline_devices(device_count, ap_count)
+    ap_data, bssid_to_ap = make_ap_topology(ap_count)
+    ap_index = dashboard.APIndex(ap_data, bssid_to_ap)
+    # Warm the OS classifier cache so it isn't counted below
+    dashboard.process_network_devices(network, devices, make_ap_topology(ap_count)[0], ap_index)
+
+    legacy, legacy_bytes, legacy_blocks, legacy_tracked, legacy_collections = measure_retained(
+        lambda: legacy_process_devices(network, devices, make_ap_topology(ap_count)[0], ap_index)['devices'])
+    records, record_bytes, record_blocks, record_tracked, record_collections = measure_retained(
+        lambda: dashboard.process_network_devices(network, devices, make_ap_topology(ap_count)[0], ap_index)['devices'])
+    same = legacy == records.to_list()
+
+    per_thousand = 1000 / device_count
+    print(f"  output {'identical' if same else 'differs'}")
+    print(f"  dicts:   {legacy_bytes * per_thousand / 1024:.0f} KB and {legacy_blocks * per_thousand:.0f} allocations "
+          f"per 1,000 devices, {legacy_collections} GC runs while building, {legacy_tracked} objects left GC-tracked")
+    print(f"  rows:    {record_bytes * per_thousand / 1024:.0f} KB and {record_blocks * per_thousand:.0f} allocations "
+          f"per 1,000 devices, {record_collections} GC runs while building, {record_tracked} objects left GC-tracked")
+    print(f"  memory reduction: {100 * (1 - record_bytes / legacy_bytes):.0f}%")
+
+    # Full collections walk every tracked object that is still alive
+    del records
+    report("gc.collect() with dicts alive", time_call(gc.collect, repeat=10))
+    del legacy
+    records = dashboard.process_network_devices(network, devices, make_ap_topology(ap_count)[0], ap_index)['devices']
+    report("gc.collect() with rows alive", time_call(gc.collect, repeat=10))
+
+    # Formatting now happens when serializing
+    legacy = records.to_list()
+    report("json.dumps dicts", time_call(lambda: json.dumps(legacy, separators=(',', ':')), repeat=10))
+    report("json.dumps rows", time_call(
+        lambda: json.dumps(records, separators=(',', ':'), default=dashboard.json_default), repeat=10))
+    # Rows hold only atomic values, so they must not stay GC-tracked
+    return same and record_bytes < legacy_bytes and record_tracked < device_count // 100
+
+def stats_close(left, right, tolerance=0.11):
+    """Compare two summaries, allowing for rounding of float sums"""
+    if isinstance(left, dict) and isinstance(right, dict):
+        return left.keys() == right.keys() and all(stats_close(left[k], right[k], tolerance) for k in left)
+    if isinstance(left, float) or isinstance(right, float):
+        return abs(left - right) <= tolerance
+    return left == right
+
+def bench_signal_analytics(device_counts=(1000, 5000, 20000), ap_count=200):
+    """Benchmark /api/signal/summary with NumPy and the pure-Python fallback"""
+    print(f"\n📊 Signal analytics: {ap_count} APs, engine {'numpy' if dashboard.np is not None else 'python only'}")
+    ap_data, bssid_to_ap = make_ap_topology(ap_count)
+    ap_index = dashboard.APIndex(ap_data, bssid_to_ap)
+    ok = True
+    for device_count in device_counts:
+        networks = [{'id': f"net{i}", 'name': f"Network {i}"} for i in range(4)]
+        devices = make_pipeline_devices(device_count, ap_count)
+        records = []
+        for i, network in enumerate(networks):
+            records += dashboard.process_network_devices(
+                network, devices[i::len(networks)], make_ap_topology(ap_count)[0], ap_index)['devices']
+        snapshot = dashboard.CacheSnapshot(1, time.time(), {}, {'devices': records, 'last_update': None})
+
+        python_engine = dashboard.SignalAnalytics(use_numpy=False)
+        python_timings = time_call(lambda: python_engine.summarize(snapshot), repeat=5)
+        line = f"  {device_count} devices: python {statistics.median(python_timings):.1f} ms"
+        if dashboard.np is not None:
+            numpy_engine = dashboard.SignalAnalytics(use_numpy=True)
+            numpy_timings = time_call(lambda: numpy_engine.summarize(snapshot), repeat=5)
+            expected = dict(python_engine.summarize(snapshot), engine='numpy')
+            actual = numpy_engine.summarize(snapshot)
+            values = dashboard.np.array([r[0] for r in numpy_engine.readings(snapshot)])
+            reference = [round(float(v), 1) for v in dashboard.np.percentile(values, dashboard.SIGNAL_PERCENTILES)]
+            same = stats_close(expected, actual) and reference == [actual['overall'][f'p{q}_dbm'] for q in dashboard.SIGNAL_PERCENTILES]
+            ok = ok and same
+            line += (f", numpy {statistics.median(numpy_timings):.1f} ms"
+                     f" ({'matches' if same else 'DIFFERS from'} python and numpy.percentile)")
+        print(line)
+    return ok
+
+def fixture_config(fixtures):
+    """Build a config with one active network per fixture network"""
+    return {
+        'networks': [{'id': network_id, 'name': f"Network {network_id}", 'email': '', 'token': '', 'active': True}
+                     for network_id in fixtures],
+        'api_url': 'api-user.e2ro.com',
+        'timezone': 'America/New_York'
+    }
+
+def bench_update_cache(repeat=10):
+    """Benchmark a full update_cache() against generated eero API payloads"""
+    networks, devices, aps = scale['networks'], scale['devices'], scale['aps']
+    print(f"\n🔄 update_cache(): {networks} networks × {devices} devices, {aps} APs each")
+    fixtures = eero_fixtures.generate_fixtures(networks=networks, devices=devices, aps=aps)
+    session = eero_fixtures.FixtureSession(fixtures)
+
+    # Serve the fixtures instead of the eero API and config.json, and leave
+    # out the listeners that write to LOCAL_DIR
+    provider = dashboard.config_provider
+    saved = (dashboard.eero_api.session, dict(dashboard.eero_api.network_tokens),
+             provider.reader, list(dashboard._snapshot_listeners))
+    persistent = {dashboard.snapshot_persister.on_snapshot, dashboard.history_store.on_snapshot,
+                  dashboard.event_engine.on_snapshot}
+    root_logger = logging.getLogger()
+    log_level = root_logger.level
+    try:
+        dashboard.eero_api.session = session
+        dashboard.eero_api.network_tokens.update({network_id: 'benchmark' for network_id in fixtures})
+        provider.reader = lambda: fixture_config(fixtures)
+        provider.signature = False
+        dashboard._snapshot_listeners[:] = [listener for listener in dashboard._snapshot_listeners
+                                         if listener not in persistent]
+        root_logger.setLevel(logging.WARNING)
+
+        timings = time_call(dashboard.update_cache, repeat=repeat)
+        snapshot = dashboard.get_snapshot()
+    finally:
+        root_logger.setLevel(log_level)
+        dashboard.eero_api.session, tokens, provider.reader, listeners = saved
+        dashboard.eero_api.network_tokens.clear()
+        dashboard.eero_api.network_tokens.update(tokens)
+        dashboard._snapshot_listeners[:] = listeners
+        provider.signature = False
+
+    expected = sum(1 for network in fixtures.values() for device in network['devices'] if device['connected'])
+    processed = snapshot.combined.get('total_devices', 0)
+    report("refresh", timings, f", {statistics.median(timings) * 1000 / max(1, processed):.1f} µs/device")
+    print(f"  {processed}/{expected} connected devices processed, {session.calls} API calls")
+    return processed == expected
+
+def bench_fixture_helpers(repeat=10):
+    """Benchmark the per-device helpers on generated eero API payloads"""
+    devices, aps = scale['devices'] * scale['networks'], scale['aps']
+    print(f"\n🧩 Helpers: {devices} devices, {aps} APs")
+    network = eero_fixtures.generate_fixtures(networks=1, devices=devices, aps=aps)['20000000']
+    wireless = [device for device in network['devices'] if device.get('wireless')]
+
+    classifier = dashboard.device_os_classifier
+    report("detect_device_os, cold cache", time_call(
+        lambda: (classifier.classify.cache_clear(), [dashboard.detect_device_os(d) for d in network['devices']]),
+        repeat=repeat))
+    report("detect_device_os, warm cache", time_call(
+        lambda: [dashboard.detect_device_os(d) for d in network['devices']], repeat=repeat))
+    report("parse_frequency", time_call(
+        lambda: [dashboard.parse_frequency(d.get('interface')) for d in network['devices']], repeat=repeat))
+    report("build_ap_data", time_call(lambda: dashboard.build_ap_data(network['eeros']), repeat=repeat))
+
+    ap_data, bssid_to_ap = dashboard.build_ap_data(network['eeros'])
+    ap_index = dashboard.APIndex(ap_data, bssid_to_ap)
+    report("AP assignment", time_call(
+        lambda: [ap_index.match(d, d.get('interface', {})) for d in wireless], repeat=repeat))
+
+    expected = legacy_assign(wireless, ap_data, bssid_to_ap)
+    actual = {d['mac']: ap_index.match(d, d.get('interface', {}))[0] for d in wireless}
+    mismatches = sum(1 for mac in expected if expected[mac] != actual[mac])
+    assigned = sum(1 for ap_id in actual.values() if ap_id)
+    print(f"  {assigned}/{len(wireless)} wireless devices assigned, {mismatches} mismatches with the legacy loop")
+    return mismatches == 0
+
+BENCHMARKS = [
+    ("Presence tracker", bench_presence_tracker),
+    ("AP assignment", bench_ap_assignment),
+    ("Device OS classifier", bench_device_os),
+    ("Device pipeline", bench_device_pipeline),
+    ("Device records", bench_device_records),
+    ("Signal analytics", bench_signal_analytics),
+    ("update_cache", bench_update_cache),
+    ("Fixture helpers", bench_fixture_helpers),
+]
+
+def git_commit():
+    """Get the current git commit, if this is a checkout"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=Path(__file__).parent,
+                              capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+def load_previous_run(history_file):
+    """Get the last recorded run from the history file, or None"""
+    try:
+        with open(history_file) as f:
+            lines = [line for line in f if line.strip()]
+        return json.loads(lines[-1]) if lines else None
+    except (OSError, ValueError):
+        return None
+
+def compare_runs(previous, current):
+    """Print results that got slower than the previous run; return how many regressed"""
+    if not previous:
+        print("\n📈 No previous run to compare against")
+        return 0
+    print(f"\n📈 Compared with {previous.get('version')} ({previous.get('commit') or 'unknown commit'}) "
+          f"from {previous.get('timestamp')}")
+    if previous.get('scale') != current['scale']:
+        print(f"  ⚠️  scale differs: {previous.get('scale')} vs {current['scale']}")
+    regressions = 0
+    for key, median in current['results'].items():
+        before = previous.get('results', {}).get(key)
+        if not before or median <= before * (1 + REGRESSION_THRESHOLD):
+            continue
+        regressions += 1
+        print(f"  ❌ {key}: {before:.2f} ms → {median:.2f} ms (+{(median / before - 1) * 100:.0f}%)")
+    if not regressions:
+        print(f"  ✅ nothing more than {REGRESSION_THRESHOLD * 100:.0f}% slower")
+    return regressions
+
+def main():
+    """Run the benchmarks and record the results"""
+    global current_benchmark
+    parser = argparse.ArgumentParser(description="Eero Dashboard benchmarks")
+    parser.add_argument('--only', action='append', metavar='NAME',
+                        help="run only benchmarks whose name contains NAME (repeatable)")
+    parser.add_argument('--networks', type=int, default=scale['networks'], help="fixture networks")
+    parser.add_argument('--devices', type=int, default=scale['devices'], help="fixture devices per network")
+    parser.add_argument('--aps', type=int, default=scale['aps'], help="fixture APs per network")
+    parser.add_argument('--history', type=Path, default=HISTORY_FILE, help="results history file (JSON lines)")
+    parser.add_argument('--no-history', action='store_true', help="don't record or compare results")
+    args = parser.parse_args()
+    scale.update(networks=args.networks, devices=args.devices, aps=args.aps)
+
+    print("⏱️  Eero Dashboard Benchmarks")
+    print("=" * 40)
+
+    outcomes = []
+    for name, bench in BENCHMARKS:
+        if args.only and not any(only.lower() in name.lower() for only in args.only):
+            continue
+        current_benchmark = name
+        try:
+            outcomes.append((name, bench()))
+        except Exception as e:
+            print(f"❌ {name} benchmark failed with error: {str(e)}")
+            outcomes.append((name, False))
+
+    if not args.no_history:
+        run = {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'version': dashboard.VERSION,
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'scale': dict(scale),
+            'results': results
+        }
+        compare_runs(load_previous_run(args.history), run)
+        try:
+            with open(args.history, 'a') as f:
+                f.write(json.dumps(run) + "\n")
+            print(f"  results recorded in {args.history}")
+        except OSError as e:
+            print(f"  ⚠️  could not record results: {str(e)}")
+
+    print("\n" + "=" * 40)
+    for name, ok in outcomes:
+        print(f"{'✅' if ok else '❌'} {name}")
+
+    return all(ok for _, ok in outcomes)
+
+if __name__ == '__main__':
+    success = main()
+    sys.exit(0 if success else 1)
@@ -7,16 +7,45 @@ Version: 7.0.14-admin-network-renaming
 import os
 import sys
 import json
+import queue
+import random
+import atexit
+import sqlite3
 import requests
 import threading
 import time
+import copy
+import re
+import gzip
+import hashlib
+import heapq
+import cProfile
+from array import array
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
 from datetime import datetime, timedelta
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, Response, g, jsonify, request, send_from_directory
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from pathlib import Path
+from types import MappingProxyType
 import logging
+import logging.handlers
 import pytz
 
+try:
+    import brotli
+except ImportError:
+    brotli = None  # optional; the dashboard page is served gzipped without it
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # optional; signal analytics fall back to pure Python
+
 # Configuration for Raspberry Pi deployment
 VERSION = "8.0.0-interface-controls-boot-notifications"
 LOCAL_DIR = Path.home() / ".eero-dashboard"
@@ -28,17 +57,7 @@ DATA_CACHE_FILE = LOCAL_DIR / "data_cache.json"
 # Ensure local directory exists
 LOCAL_DIR.mkdir(exist_ok=True)
 
-# Setup logging optimized for Pi
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(LOCAL_DIR / 'dashboard.log'),
-        logging.StreamHandler()
-    ]
-)
-
-# Rotate logs to prevent SD card filling up
+# Rotate logs to prevent SD card filling up (before the log file is opened)
 log_file = LOCAL_DIR / 'dashboard.log'
 if log_file.exists() and log_file.stat().st_size > 10 * 1024 * 1024:  # 10MB
     backup_file = LOCAL_DIR / f'dashboard.log.{int(time.time())}'
@@ -48,6 +67,24 @@ if log_file.exists() and log_file.stat().st_size > 10 * 1024 * 1024:  # 10MB
     for old_backup in backup_files[:-3]:
         old_backup.unlink()
 
+# Setup logging optimized for Pi: request and poller threads only enqueue
+# records, a listener thread does the file and console writes
+log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+log_handlers = [logging.FileHandler(log_file), logging.StreamHandler()]
+for log_handler in log_handlers:
+    log_handler.setFormatter(log_formatter)
+
+log_queue = queue.Queue(-1)
+log_queue_handler = logging.handlers.QueueHandler(log_queue)
+log_queue_handler.setFormatter(logging.Formatter('%(message)s'))
+log_listener = logging.handlers.QueueListener(log_queue, *log_handlers, respect_handler_level=True)
+logging.basicConfig(
+    level=logging.INFO,
+    handlers=[log_queue_handler]
+)
+log_listener.start()
+atexit.register(log_listener.stop)
+
 # Flask app with Pi-optimized settings
 app = Flask(__name__)
 CORS(app)
@@ -57,8 +94,8 @@ if not app.debug:
     log = logging.getLogger('werkzeug')
     log.setLevel(logging.ERROR)
 
-def load_config():
-    """Load configuration"""
+def _read_config_file():
+    """Read and parse config.json from disk"""
     try:
         if CONFIG_FILE.exists():
             with open(CONFIG_FILE, 'r') as f:
@@ -89,11 +126,98 @@ def load_config():
         "timezone": "America/New_York"
     }
 
+def _freeze(value):
+    """Get a read-only copy of parsed JSON (dicts become mappingproxies, lists tuples)"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+class ConfigProvider:
+    """Keeps the parsed config.json in memory
+    
+    The file is only parsed again when its mtime, inode or size changes, or
+    when save_config() writes it, so the per-request cost is one stat().
+    get() hands out a shared read-only view; load() returns a private
+    mutable copy for read-modify-write callers. The resolved tzinfo is
+    cached alongside the config.
+    """
+    
+    def __init__(self, path, reader):
+        self.path = path
+        self.reader = reader
+        self.lock = threading.Lock()
+        self.signature = False   # never matches a real stat signature
+        self.config = None
+        self.view = None
+        self.revision = 0
+        self.tz_name = None
+        self.tz = None
+    
+    def _stat_signature(self):
+        try:
+            st = self.path.stat()
+            return (st.st_mtime_ns, st.st_ino, st.st_size)
+        except OSError:
+            return None
+    
+    def _current(self):
+        signature = self._stat_signature()
+        with self.lock:
+            if signature != self.signature:
+                self._set(self.reader(), signature)
+            return self.config, self.view
+    
+    def _set(self, config, signature):
+        self.config = config
+        self.view = _freeze(config)
+        self.signature = signature
+        self.revision += 1
+    
+    def get(self):
+        """Get a read-only view of the current config"""
+        return self._current()[1]
+    
+    def load(self):
+        """Get a mutable copy of the current config"""
+        return copy.deepcopy(self._current()[0])
+    
+    def stored(self, config):
+        """Record a config that was just written to disk"""
+        signature = self._stat_signature()
+        with self.lock:
+            self._set(copy.deepcopy(config), signature)
+    
+    def timezone(self):
+        """Get the configured tzinfo, resolved once per timezone name"""
+        tz_name = self.get().get('timezone', 'America/New_York')
+        with self.lock:
+            if tz_name != self.tz_name:
+                try:
+                    self.tz = pytz.timezone(tz_name)
+                except Exception as e:
+                    logging.warning("Timezone error, using UTC: " + str(e))
+                    self.tz = pytz.UTC
+                self.tz_name = tz_name
+            return self.tz
+
+config_provider = ConfigProvider(CONFIG_FILE, _read_config_file)
+
+def load_config():
+    """Load configuration (mutable copy, safe to modify and pass to save_config)"""
+    return config_provider.load()
+
+def get_config():
+    """Get a read-only view of the configuration for callers that only read it"""
+    return config_provider.get()
+
 def save_config(config):
     """Save configuration"""
     try:
         with open(CONFIG_FILE, 'w') as f:
             json.dump(config, f, indent=2)
+        config_provider.stored(config)
         return True
     except Exception as e:
         logging.error("Config save error: " + str(e))
@@ -102,18 +226,15 @@ def save_config(config):
 def get_timezone_aware_now():
     """Get current time in configured timezone"""
     try:
-        config = load_config()
-        tz_name = config.get('timezone', 'America/New_York')
-        tz = pytz.timezone(tz_name)
-        return datetime.now(tz)
+        return datetime.now(config_provider.timezone())
     except Exception as e:
         logging.warning("Timezone error, using UTC: " + str(e))
         return datetime.now(pytz.UTC)
 
-# Initialize data cache
-data_cache = {
-    'networks': {},
-    'combined': {
+# Data cache snapshots
+def empty_combined_cache():
+    """Get combined cache contents for before the first refresh"""
+    return {
         'connected_users': [],
         'device_os': {},
         'frequency_distribution': {},
@@ -121,52 +242,1542 @@ data_cache = {
         'devices': [],
         'last_update': None
     }
-}
 
-def detect_device_os(device):
-    """Detect device OS from manufacturer and hostname"""
-    manufacturer = str(device.get('manufacturer', '')).lower()
-    hostname = str(device.get('hostname', '')).lower()
-    text = manufacturer + " " + hostname
+class CacheSnapshot:
+    """One complete, published result of a cache refresh
     
-    # Amazon detection (prioritize manufacturer field)
-    if any(k in manufacturer for k in ['amazon', 'amazon technologies']):
-        return 'Amazon'
-    elif any(k in text for k in ['echo', 'alexa', 'fire tv', 'kindle']):
-        return 'Amazon'
+    A refresh builds a brand new snapshot and publish_snapshot() swaps the
+    module-level reference in one assignment. Snapshots are never modified
+    after publishing, so a reader that grabs get_snapshot() once sees a
+    consistent view of every network without taking a lock.
+    """
+    __slots__ = ('version', 'built_at', 'networks', 'combined')
     
-    # Apple/iOS detection
-    elif any(k in manufacturer for k in ['apple', 'apple inc']):
-        return 'iOS'
-    elif any(k in text for k in ['iphone', 'ipad', 'mac', 'ios', 'apple']):
-        return 'iOS'
+    def __init__(self, version, built_at, networks, combined):
+        self.version = version      # increases by one per publish
+        self.built_at = built_at    # epoch seconds when the snapshot was published
+        self.networks = networks    # {network_id: network cache dict}
+        self.combined = combined    # combined cache dict across networks
     
-    # Android detection (includes many manufacturers)
-    elif any(k in manufacturer for k in ['samsung', 'google', 'lg electronics', 'htc', 'sony', 'motorola', 'huawei', 'xiaomi', 'oneplus']):
-        return 'Android'
-    elif any(k in text for k in ['android', 'pixel', 'galaxy']):
-        return 'Android'
+    def to_dict(self):
+        """Get the snapshot as a plain JSON-serializable dict"""
+        return {
+            'version': self.version,
+            'built_at': self.built_at,
+            'networks': self.networks,
+            'combined': self.combined
+        }
+
+# Snapshot devices are stored as rows: plain tuples of raw values (numbers
+# stay numbers, IPs stay a tuple) with repeated strings such as the
+# manufacturer, band and network name shared. Rows only hold strings,
+# numbers, None and tuples of strings, so CPython stops GC-tracking them
+# after their first collection and full collections don't walk devices.
+DEVICE_FIELDS = ('name', 'ips', 'mac', 'manufacturer', 'device_os', 'wireless', 'frequency',
+                 'frequency_band', 'signal_dbm', 'signal_value', 'network_id', 'network_name',
+                 'ap_id', 'ap_name')
+(DEVICE_NAME, DEVICE_IPS, DEVICE_MAC, DEVICE_MANUFACTURER, DEVICE_OS, DEVICE_WIRELESS,
+ DEVICE_FREQUENCY, DEVICE_BAND, DEVICE_SIGNAL_DBM, DEVICE_SIGNAL_VALUE, DEVICE_NETWORK_ID,
+ DEVICE_NETWORK_NAME, DEVICE_AP_ID, DEVICE_AP_NAME) = range(len(DEVICE_FIELDS))
+
+def device_row(name, ips, mac, manufacturer, device_os, wireless, frequency,
+               frequency_band, signal_dbm, network_id, network_name, ap_id=None, ap_name=None):
+    """Build a device row; the signal is parsed once, into DEVICE_SIGNAL_VALUE
     
-    # Windows detection
-    elif any(k in manufacturer for k in ['microsoft', 'dell', 'hp', 'lenovo', 'asus', 'acer', 'msi']):
-        return 'Windows'
-    elif any(k in text for k in ['windows', 'microsoft', 'surface']):
-        return 'Windows'
+    ips is compact_ips() output, frequency is GHz as reported (None if
+    unknown) and signal_dbm is as reported by the API ('N/A' if missing).
+    """
+    return (name, ips, mac, intern_value(manufacturer), device_os, wireless, intern_value(frequency),
+            frequency_band, signal_dbm, parse_signal_dbm(signal_dbm) if wireless else None,
+            network_id, network_name, ap_id, ap_name)
+
+def device_to_dict(row):
+    """Get a device row as the dashboard's JSON dict"""
+    (name, ips, mac, manufacturer, device_os, wireless, frequency, frequency_band,
+     signal_dbm, signal_value, network_id, network_name, ap_id, ap_name) = row
+    if wireless:
+        frequency = str(frequency) + " GHz" if frequency is not None else 'N/A'
+        if signal_dbm and signal_value is not None:
+            signal_percent, signal_quality = rate_signal(signal_value)
+        else:
+            signal_percent, signal_quality = 0, 'Unknown'
+    else:
+        frequency = 'Wired'
+        signal_percent, signal_quality = 100, 'Wired'
+    return {
+        'name': name,
+        'ip': (ips if type(ips) is str else ', '.join(ips)) if ips else 'N/A',
+        'mac': mac,
+        'manufacturer': manufacturer,
+        'device_os': device_os,
+        'connection_type': 'Wireless' if wireless else 'Wired',
+        'frequency': frequency,
+        'frequency_band': frequency_band,
+        'signal_avg_dbm': str(signal_dbm) + " dBm" if signal_dbm != 'N/A' else 'N/A',
+        'signal_avg': signal_percent,
+        'signal_quality': signal_quality,
+        'network_id': network_id,
+        'network_name': network_name,
+        'ap_id': ap_id,
+        'ap_name': ap_name
+    }
+
+def device_from_dict(device):
+    """Rebuild a device row from its device_to_dict() form, e.g. a persisted snapshot"""
+    wireless = device.get('connection_type') == 'Wireless'
+    ip = device.get('ip', 'N/A')
+    frequency = device.get('frequency', 'N/A')
+    signal = device.get('signal_avg_dbm', 'N/A')
+    if isinstance(signal, str) and signal.endswith(' dBm'):
+        signal = signal[:-len(' dBm')]
+        for number in (int, float):
+            try:
+                signal = number(signal)
+                break
+            except ValueError:
+                continue
+    return device_row(
+        device.get('name', 'Unknown Device'),
+        compact_ips(ip.split(', ')) if ip and ip != 'N/A' else None,
+        device.get('mac', 'N/A'),
+        device.get('manufacturer', 'Unknown'),
+        intern_value(device.get('device_os', 'Other')),
+        wireless,
+        frequency[:-len(' GHz')] if isinstance(frequency, str) and frequency.endswith(' GHz') else None,
+        intern_value(device.get('frequency_band', 'Unknown')),
+        signal,
+        intern_value(device.get('network_id')),
+        intern_value(device.get('network_name')),
+        device.get('ap_id'),
+        device.get('ap_name')
+    )
+
+class DeviceTable:
+    """A snapshot's device rows, formatted as dashboard dicts only when serialized"""
+    __slots__ = ('rows',)
     
-    # Gaming consoles and other specific devices
-    elif any(k in manufacturer for k in ['sony computer entertainment', 'nintendo']):
-        return 'Gaming'
-    elif any(k in text for k in ['playstation', 'xbox', 'nintendo', 'steam deck']):
-        return 'Gaming'
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+    
+    def __iter__(self):
+        return iter(self.rows)
+    
+    def __len__(self):
+        return len(self.rows)
+    
+    def to_list(self):
+        """Get the devices as the dashboard's JSON list"""
+        return [device_to_dict(row) for row in self.rows]
+
+def compact_ips(ips):
+    """Store a device's IPs as None, a single string or a tuple
+    
+    Most devices have one address; keeping it as a plain string avoids
+    allocating a tuple per device.
+    """
+    if not ips:
+        return None
+    if len(ips) == 1:
+        return ips[0]
+    return tuple(ips)
+
+def intern_value(value):
+    """Intern strings so equal values share one object across devices"""
+    return sys.intern(value) if type(value) is str else value
+
+def json_default(value):
+    """json.dumps() default: serialize DeviceTables as lists of dashboard dicts"""
+    if isinstance(value, DeviceTable):
+        return value.to_list()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+class DashboardJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that understands DeviceTable"""
+    
+    @staticmethod
+    def default(value):
+        if isinstance(value, DeviceTable):
+            return value.to_list()
+        return DefaultJSONProvider.default(value)
+
+app.json = DashboardJSONProvider(app)
+
+_snapshot = CacheSnapshot(0, None, {}, empty_combined_cache())
+_publish_lock = threading.Lock()
+_snapshot_listeners = []
+
+def get_snapshot():
+    """Get the latest published cache snapshot"""
+    return _snapshot
+
+def add_snapshot_listener(listener):
+    """Register a callable invoked with every newly published snapshot"""
+    _snapshot_listeners.append(listener)
+    return listener
+
+def publish_snapshot(networks, combined):
+    """Publish a fully built cache as the new current snapshot
+    
+    Listeners run in the publishing thread after the swap; a failing
+    listener is logged and does not affect the others.
+    """
+    global _snapshot
+    with _publish_lock:
+        snapshot = CacheSnapshot(_snapshot.version + 1, time.time(), networks, combined)
+        _snapshot = snapshot
+    for listener in _snapshot_listeners:
+        try:
+            listener(snapshot)
+        except Exception as e:
+            name = getattr(listener, '__qualname__', str(listener))
+            logging.error(f"Snapshot listener {name} error: {str(e)}")
+            listener_errors.inc(name)
+    return snapshot
+
+def snapshot_is_fresh(snapshot):
+    """Check whether a snapshot carries data from a successful refresh
+    
+    Restored (stale) snapshots and the snapshots published after a failed
+    refresh only repeat earlier data.
+    """
+    combined = snapshot.combined
+    last_update = combined.get('last_update')
+    return bool(last_update) and not combined.get('stale') and combined.get('last_successful_update') == last_update
+
+def refreshed_network_ids(snapshot):
+    """Get the ids of networks whose data was fetched for this snapshot"""
+    last_update = snapshot.combined.get('last_update')
+    return {network_id for network_id, network_cache in snapshot.networks.items()
+            if network_cache.get('last_update') == last_update}
+
+# Snapshot persistence
+DEFAULT_PERSIST_INTERVAL = 300  # seconds between writes of DATA_CACHE_FILE
+MIN_PERSIST_INTERVAL = 30       # limit SD card wear
+
+def write_json_atomic(path, data):
+    """Write compact JSON to path via a temp file and rename
+    
+    Readers (and a crash mid-write) only ever see the old or the new file,
+    never a truncated one.
+    """
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, separators=(',', ':'), default=json_default)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+class SnapshotPersister:
+    """Periodically saves the current snapshot to DATA_CACHE_FILE
+    
+    Writes happen at most once per persistence.interval_seconds and only
+    for snapshots built from fresh data. On startup restore() publishes the
+    saved snapshot, marked stale, so the dashboard has its history and last
+    known state before the first upstream refresh completes.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.last_written = None
+        self.last_version = None
+    
+    def settings(self):
+        persistence = get_config().get('persistence', {})
+        try:
+            interval = max(MIN_PERSIST_INTERVAL, float(persistence.get('interval_seconds', DEFAULT_PERSIST_INTERVAL)))
+        except (TypeError, ValueError):
+            interval = DEFAULT_PERSIST_INTERVAL
+        return bool(persistence.get('enabled', True)), interval
+    
+    def on_snapshot(self, snapshot):
+        """Snapshot listener: persist if the write interval has elapsed"""
+        enabled, interval = self.settings()
+        if not enabled or snapshot.combined.get('stale'):
+            return
+        if self.last_written is not None and time.monotonic() - self.last_written < interval:
+            return
+        self.persist(snapshot)
+    
+    def persist(self, snapshot=None):
+        """Write a snapshot (default: the current one) to disk now"""
+        snapshot = snapshot or get_snapshot()
+        if snapshot.version == 0:
+            return False
+        with self.lock:
+            if snapshot.version == self.last_version:
+                return True
+            try:
+                write_json_atomic(self.path, snapshot.to_dict())
+                self.last_written = time.monotonic()
+                self.last_version = snapshot.version
+                logging.info(f"Persisted cache snapshot v{snapshot.version} to {self.path.name}")
+                return True
+            except Exception as e:
+                logging.error("Cache persist error: " + str(e))
+                return False
+    
+    def restore(self):
+        """Publish the persisted snapshot, marked stale, if one exists"""
+        try:
+            if not self.path.exists():
+                return None
+            with open(self.path, 'r') as f:
+                saved = json.load(f)
+            networks = {}
+            for network_id, network_cache in saved.get('networks', {}).items():
+                networks[network_id] = dict(network_cache, stale=True, devices=DeviceTable(
+                    device_from_dict(device) for device in network_cache.get('devices', [])))
+            combined = dict(empty_combined_cache(), **saved.get('combined', {}))
+            combined['devices'] = DeviceTable(device_from_dict(device) for device in combined['devices'])
+            combined['stale'] = True
+            # Don't rewrite the file we just loaded
+            self.last_written = time.monotonic()
+            snapshot = publish_snapshot(networks, combined)
+            logging.info(f"Restored cache snapshot from {self.path.name} (last update {combined.get('last_update')})")
+            return snapshot
+        except Exception as e:
+            logging.error("Cache restore error: " + str(e))
+            return None
+
+snapshot_persister = SnapshotPersister(DATA_CACHE_FILE)
+add_snapshot_listener(snapshot_persister.on_snapshot)
+
+# Long-term history
+HISTORY_DB_FILE = LOCAL_DIR / "history.db"
+COMBINED_SERIES_ID = 'combined'
+
+# (bucket seconds, retention seconds, longest range in hours served from it);
+# resolution 0 holds one raw row per refresh
+HISTORY_RESOLUTIONS = (
+    (0, 2 * 86400, 6),
+    (300, 14 * 86400, 48),
+    (3600, 180 * 86400, 60 * 24),
+    (86400, 10 * 365 * 86400, None),
+)
+
+class HistoryStore:
+    """SQLite time-series store for device counts and average signal
+    
+    Every refreshed network (plus the combined totals) gets one raw row per
+    refresh. The same sample is folded into the 5 minute, 1 hour and 1 day
+    rollup buckets with an upsert that keeps running min/max/mean, so no
+    batch rollup job is needed. Each resolution keeps its own retention and
+    range queries pick the finest resolution that covers the window.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS samples (
+            resolution INTEGER NOT NULL,
+            series TEXT NOT NULL,
+            ts INTEGER NOT NULL,
+            count_avg REAL NOT NULL,
+            count_min INTEGER NOT NULL,
+            count_max INTEGER NOT NULL,
+            samples INTEGER NOT NULL,
+            signal_avg REAL,
+            signal_samples INTEGER NOT NULL,
+            PRIMARY KEY (resolution, series, ts)
+        ) WITHOUT ROWID
+    """
+    
+    UPSERT = """
+        INSERT INTO samples (resolution, series, ts, count_avg, count_min, count_max,
+                             samples, signal_avg, signal_samples)
+        VALUES (?, ?, ?, ?, ?, ?, 1, ?, ?)
+        ON CONFLICT (resolution, series, ts) DO UPDATE SET
+            count_avg = (count_avg * samples + excluded.count_avg) / (samples + 1),
+            count_min = MIN(count_min, excluded.count_min),
+            count_max = MAX(count_max, excluded.count_max),
+            samples = samples + 1,
+            signal_avg = CASE
+                WHEN excluded.signal_avg IS NULL THEN signal_avg
+                WHEN signal_avg IS NULL THEN excluded.signal_avg
+                ELSE (signal_avg * signal_samples + excluded.signal_avg) / (signal_samples + 1)
+            END,
+            signal_samples = signal_samples + excluded.signal_samples
+    """
+    
+    PRUNE_INTERVAL = 3600  # seconds between retention sweeps
+    
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = None
+        self.last_prune = 0
+    
+    def _connect(self):
+        if self.conn is None:
+            self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute(self.SCHEMA)
+            self.conn.commit()
+        return self.conn
+    
+    def enabled(self):
+        return bool(get_config().get('history_store', {}).get('enabled', True))
+    
+    def record(self, ts, samples):
+        """Store one refresh worth of samples
+        
+        samples is a list of (series, device_count, avg_signal_dbm or None).
+        """
+        ts = int(ts)
+        rows = []
+        for series, count, signal in samples:
+            for resolution, _, _ in HISTORY_RESOLUTIONS:
+                bucket = ts - ts % resolution if resolution else ts
+                rows.append((resolution, series, bucket, count, count, count,
+                             signal, 1 if signal is not None else 0))
+        with self.lock:
+            conn = self._connect()
+            conn.executemany(self.UPSERT, rows)
+            if ts - self.last_prune >= self.PRUNE_INTERVAL:
+                for resolution, retention, _ in HISTORY_RESOLUTIONS:
+                    conn.execute("DELETE FROM samples WHERE resolution = ? AND ts < ?",
+                                 (resolution, ts - retention))
+                self.last_prune = ts
+            conn.commit()
+    
+    def on_snapshot(self, snapshot):
+        """Snapshot listener: record the networks refreshed in this snapshot"""
+        if not snapshot_is_fresh(snapshot) or not self.enabled():
+            return
+        
+        combined = snapshot.combined
+        samples = [(COMBINED_SERIES_ID, combined.get('total_devices', 0), combined.get('avg_signal_dbm'))]
+        for network_id in refreshed_network_ids(snapshot):
+            network_cache = snapshot.networks[network_id]
+            samples.append((network_id, network_cache.get('total_devices', 0), network_cache.get('avg_signal_dbm')))
+        self.record(snapshot.built_at, samples)
+    
+    @staticmethod
+    def resolution_for(hours):
+        """Get the finest bucket width whose retention covers the range"""
+        for resolution, _, max_hours in HISTORY_RESOLUTIONS:
+            if max_hours is None or hours <= max_hours:
+                return resolution
+        return HISTORY_RESOLUTIONS[-1][0]
+    
+    def query(self, series, hours, now=None):
+        """Get history for the last N hours in the dashboard's series format
+        
+        Returns (resolution, connected_users, signal_strength_avg).
+        """
+        now = int(now or time.time())
+        resolution = self.resolution_for(hours)
+        with self.lock:
+            rows = self._connect().execute(
+                "SELECT ts, count_avg, count_min, count_max, signal_avg FROM samples "
+                "WHERE resolution = ? AND series = ? AND ts >= ? ORDER BY ts",
+                (resolution, series, now - int(hours * 3600))
+            ).fetchall()
+        
+        tz = config_provider.timezone()
+        connected_users = []
+        signal_strength_avg = []
+        for ts, count_avg, count_min, count_max, signal_avg in rows:
+            timestamp = datetime.fromtimestamp(ts, tz).isoformat()
+            point = {'timestamp': timestamp, 'count': round(count_avg)}
+            if resolution:
+                point.update({'min': count_min, 'max': count_max})
+            connected_users.append(point)
+            if signal_avg is not None:
+                signal_strength_avg.append({'timestamp': timestamp, 'avg_dbm': round(signal_avg, 1)})
+        return resolution, connected_users, signal_strength_avg
+    
+    def close(self):
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+history_store = HistoryStore(HISTORY_DB_FILE)
+add_snapshot_listener(history_store.on_snapshot)
+
+# Device presence tracking
+DEFAULT_PRESENCE_MAX_DEVICES = 8192
+DEFAULT_PRESENCE_RSSI_SAMPLES = 64   # per device
+DEFAULT_PRESENCE_SESSIONS = 8        # per device
+NO_RSSI = -128
+
+def mac_to_int(mac):
+    """Get a MAC address as an integer key (None if it doesn't parse)"""
+    try:
+        value = int(str(mac).replace(':', '').replace('-', ''), 16)
+        return value if 0 <= value < 1 << 48 else None
+    except ValueError:
+        return None
+
+def int_to_mac(value):
+    """Format an integer key back into aa:bb:cc:dd:ee:ff"""
+    raw = f"{value:012x}"
+    return ':'.join(raw[i:i + 2] for i in range(0, 12, 2))
+
+def parse_signal_dbm(signal):
+    """Get a dBm reading as a float from a number or a "-62 dBm" string (None if missing)"""
+    if signal is None or signal == 'N/A':
+        return None
+    if isinstance(signal, (int, float)):
+        return float(signal)
+    try:
+        return float(str(signal).replace('dBm', '').strip())
+    except ValueError:
+        return None
+
+class PresenceTracker:
+    """Per-device presence history kept in preallocated array slots
+    
+    Every MAC gets a slot index into flat typed arrays (first/last seen,
+    current session start, network) plus two per-slot ring buffers: recent
+    RSSI samples (int8 dBm + uint32 timestamp) and completed sessions
+    (start/end pairs). Memory is fixed by max_devices; when every slot is
+    taken the offline device seen longest ago is evicted, found through a
+    heap of (last_seen, slot) pushed as devices go offline.
+    """
+    
+    def __init__(self, max_devices=DEFAULT_PRESENCE_MAX_DEVICES,
+                 rssi_samples=DEFAULT_PRESENCE_RSSI_SAMPLES, sessions=DEFAULT_PRESENCE_SESSIONS):
+        self.lock = threading.Lock()
+        self.max_devices = max_devices
+        self.rssi_samples = rssi_samples
+        self.session_slots = sessions
+        
+        self.slots = {}                                      # MAC int -> slot
+        self.free = list(range(max_devices - 1, -1, -1))
+        self.online = set()                                  # slots connected in the last snapshot
+        self.offline = []                                    # heap of (last_seen, slot), may hold outdated entries
+        self.network_ids = []                                # interned network ids
+        self.network_index = {}
+        
+        self.mac = array('Q', bytes(8 * max_devices))
+        self.first_seen = array('d', bytes(8 * max_devices))
+        self.last_seen = array('d', bytes(8 * max_devices))
+        self.session_start = array('d', bytes(8 * max_devices))
+        self.network = array('H', bytes(2 * max_devices))
+        
+        self.rssi = array('b', [NO_RSSI]) * (rssi_samples * max_devices)
+        self.rssi_ts = array('I', bytes(4 * rssi_samples * max_devices))
+        self.rssi_head = array('H', bytes(2 * max_devices))
+        self.rssi_count = array('H', bytes(2 * max_devices))
+        
+        self.sessions = array('d', bytes(16 * sessions * max_devices))
+        self.sessions_head = array('H', bytes(2 * max_devices))
+        self.sessions_count = array('H', bytes(2 * max_devices))
+    
+    def _network(self, network_id):
+        index = self.network_index.get(network_id)
+        if index is None:
+            index = self.network_index[network_id] = len(self.network_ids)
+            self.network_ids.append(network_id)
+        return index
+    
+    def _evict(self):
+        """Free the slot of the offline device seen longest ago, if there is one
+        
+        Heap entries are outdated once their slot was seen again, so slots
+        seen in the current update (or online) are never evicted.
+        """
+        while self.offline:
+            last_seen, slot = heapq.heappop(self.offline)
+            if self.last_seen[slot] == last_seen and slot not in self.online:
+                del self.slots[self.mac[slot]]
+                self.free.append(slot)
+                return True
+        return False
+    
+    def _allocate(self, mac_int, ts):
+        if not self.free and not self._evict():
+            return None
+        slot = self.free.pop()
+        self.slots[mac_int] = slot
+        self.mac[slot] = mac_int
+        self.first_seen[slot] = ts
+        self.session_start[slot] = 0
+        self.rssi_head[slot] = self.rssi_count[slot] = 0
+        self.sessions_head[slot] = self.sessions_count[slot] = 0
+        return slot
+    
+    def _close_session(self, slot):
+        heapq.heappush(self.offline, (self.last_seen[slot], slot))
+        n = self.session_slots
+        index = 2 * (slot * n + self.sessions_head[slot])
+        self.sessions[index] = self.session_start[slot]
+        self.sessions[index + 1] = self.last_seen[slot]
+        self.sessions_head[slot] = (self.sessions_head[slot] + 1) % n
+        self.sessions_count[slot] = min(n, self.sessions_count[slot] + 1)
+        self.session_start[slot] = 0
+    
+    def update(self, ts, devices, refreshed_networks):
+        """Fold one snapshot's connected devices into the tracker
+        
+        devices is an iterable of (mac, network_id, signal_dbm or None).
+        Devices that were online and are missing now are only marked
+        disconnected if their network was refreshed in this snapshot.
+        """
+        n = self.rssi_samples
+        stamp = int(ts)
+        seen = set()
+        with self.lock:
+            for mac, network_id, signal in devices:
+                mac_int = mac_to_int(mac)
+                if mac_int is None:
+                    continue
+                slot = self.slots.get(mac_int)
+                if slot is None:
+                    slot = self._allocate(mac_int, ts)
+                    if slot is None:
+                        continue
+                seen.add(slot)
+                if slot not in self.online:
+                    self.session_start[slot] = ts
+                self.last_seen[slot] = ts
+                self.network[slot] = self._network(network_id)
+                if signal is not None:
+                    index = slot * n + self.rssi_head[slot]
+                    self.rssi[index] = max(-127, min(127, int(round(signal))))
+                    self.rssi_ts[index] = stamp
+                    self.rssi_head[slot] = (self.rssi_head[slot] + 1) % n
+                    if self.rssi_count[slot] < n:
+                        self.rssi_count[slot] += 1
+            
+            refreshed = {self.network_index[nid] for nid in refreshed_networks if nid in self.network_index}
+            for slot in self.online - seen:
+                if self.network[slot] in refreshed:
+                    self._close_session(slot)
+                else:
+                    seen.add(slot)
+            self.online = seen
+            
+            if len(self.offline) > 2 * self.max_devices:
+                # Drop outdated entries so the heap stays bounded
+                self.offline = [(self.last_seen[slot], slot) for slot in self.slots.values()
+                                if slot not in seen]
+                heapq.heapify(self.offline)
+    
+    def on_snapshot(self, snapshot):
+        """Snapshot listener: track the devices of a freshly refreshed snapshot"""
+        if not snapshot_is_fresh(snapshot):
+            return
+        refreshed = refreshed_network_ids(snapshot)
+        # Stale networks' devices were not seen again, so they add no samples
+        devices = ((d[DEVICE_MAC], d[DEVICE_NETWORK_ID], d[DEVICE_SIGNAL_VALUE])
+                   for d in snapshot.combined.get('devices', []) if d[DEVICE_NETWORK_ID] in refreshed)
+        self.update(snapshot.built_at, devices, refreshed)
+    
+    def history(self, mac):
+        """Get presence history for one MAC (None if it was never seen)"""
+        mac_int = mac_to_int(mac)
+        with self.lock:
+            slot = self.slots.get(mac_int) if mac_int is not None else None
+            if slot is None:
+                return None
+            tz = config_provider.timezone()
+            iso = lambda ts: datetime.fromtimestamp(ts, tz).isoformat()
+            
+            n = self.rssi_samples
+            count = self.rssi_count[slot]
+            start = (self.rssi_head[slot] - count) % n
+            rssi = []
+            for i in range(count):
+                index = slot * n + (start + i) % n
+                rssi.append({'timestamp': iso(self.rssi_ts[index]), 'signal_dbm': self.rssi[index]})
+            
+            n = self.session_slots
+            count = self.sessions_count[slot]
+            start = (self.sessions_head[slot] - count) % n
+            sessions = []
+            for i in range(count):
+                index = 2 * (slot * n + (start + i) % n)
+                began, ended = self.sessions[index], self.sessions[index + 1]
+                sessions.append({'start': iso(began), 'end': iso(ended), 'duration_seconds': round(ended - began)})
+            
+            online = slot in self.online
+            return {
+                'mac': int_to_mac(mac_int),
+                'network_id': self.network_ids[self.network[slot]] if self.network_ids else None,
+                'online': online,
+                'first_seen': iso(self.first_seen[slot]),
+                'last_seen': iso(self.last_seen[slot]),
+                'current_session_start': iso(self.session_start[slot]) if online else None,
+                'sessions': sessions,
+                'rssi': rssi
+            }
+    
+    def stats(self):
+        with self.lock:
+            return {'tracked_devices': len(self.slots), 'online_devices': len(self.online),
+                    'max_devices': self.max_devices}
+
+def create_presence_tracker():
+    """Create the presence tracker sized from the 'presence' config section"""
+    presence = get_config().get('presence', {})
+    try:
+        return PresenceTracker(
+            max_devices=max(1, int(presence.get('max_devices', DEFAULT_PRESENCE_MAX_DEVICES))),
+            rssi_samples=max(1, int(presence.get('rssi_samples', DEFAULT_PRESENCE_RSSI_SAMPLES))),
+            sessions=max(1, int(presence.get('sessions', DEFAULT_PRESENCE_SESSIONS)))
+        )
+    except (TypeError, ValueError) as e:
+        logging.warning("Invalid presence settings, using defaults: " + str(e))
+        return PresenceTracker()
+
+presence_tracker = create_presence_tracker()
+add_snapshot_listener(presence_tracker.on_snapshot)
+
+# Network events
+DEFAULT_EVENT_LOG_SIZE = 1000
+DEFAULT_SIGNAL_DEGRADED_DBM = -75   # crossing below this is an event
+DEFAULT_SIGNAL_DROP_DB = 15         # so is a drop this large between snapshots
+EVENTS_FILE = LOCAL_DIR / "events.jsonl"
+EVENTS_FILE_MAX_BYTES = 5 * 1024 * 1024
+
+class EventEngine:
+    """Derives device events by diffing consecutive snapshots
+    
+    Each fresh snapshot is indexed by MAC once and compared with the
+    previous index in O(n), emitting connect, disconnect, band change, AP
+    roam and signal degradation events into a bounded in-memory log.
+    Events can optionally be appended to EVENTS_FILE as JSON lines.
+    Readers such as /api/voice/events only read the log.
+    """
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.previous = None          # MAC -> device state of the last fresh snapshot
+        self.log = deque(maxlen=DEFAULT_EVENT_LOG_SIZE)
+        self.next_id = 1
+    
+    def settings(self):
+        events = get_config().get('events', {})
+        try:
+            return (max(1, int(events.get('max_events', DEFAULT_EVENT_LOG_SIZE))),
+                    float(events.get('signal_degraded_dbm', DEFAULT_SIGNAL_DEGRADED_DBM)),
+                    float(events.get('signal_drop_db', DEFAULT_SIGNAL_DROP_DB)),
+                    bool(events.get('spill_to_disk', False)))
+        except (TypeError, ValueError):
+            return DEFAULT_EVENT_LOG_SIZE, DEFAULT_SIGNAL_DEGRADED_DBM, DEFAULT_SIGNAL_DROP_DB, False
+    
+    @staticmethod
+    def index(devices):
+        """Index devices by MAC as (name, network_id, band, ap_id, ap_name, signal_dbm)"""
+        return {
+            device[DEVICE_MAC]: (device[DEVICE_NAME], device[DEVICE_NETWORK_ID], device[DEVICE_BAND],
+                                 device[DEVICE_AP_ID], device[DEVICE_AP_NAME], device[DEVICE_SIGNAL_VALUE])
+            for device in devices if device[DEVICE_MAC] not in (None, 'N/A')
+        }
+    
+    def diff(self, previous, current, refreshed_networks, degraded_dbm, drop_db):
+        """Compare two MAC indexes and return (event type, mac, state, details) tuples"""
+        changes = []
+        for mac, state in current.items():
+            old = previous.get(mac)
+            if old is None:
+                changes.append(('device_connected', mac, state, {}))
+                continue
+            if state[2] != old[2] and state[2] != 'Wired' and old[2] != 'Wired':
+                changes.append(('band_changed', mac, state, {'from': old[2], 'to': state[2]}))
+            if state[3] and old[3] and state[3] != old[3]:
+                changes.append(('ap_roamed', mac, state, {'from': old[4], 'to': state[4]}))
+            if state[5] is not None and old[5] is not None and (
+                    state[5] < degraded_dbm <= old[5] or old[5] - state[5] >= drop_db):
+                changes.append(('signal_degraded', mac, state, {'from': old[5], 'to': state[5]}))
+        
+        for mac, old in previous.items():
+            if mac not in current:
+                if old[1] in refreshed_networks:
+                    changes.append(('device_disconnected', mac, old, {}))
+                else:
+                    # Network wasn't refreshed; keep the device for the next diff
+                    current[mac] = old
+        return changes
+    
+    @staticmethod
+    def describe(event_type, name, details):
+        if event_type == 'device_connected':
+            return f"{name} connected"
+        if event_type == 'device_disconnected':
+            return f"{name} disconnected"
+        if event_type == 'band_changed':
+            return f"{name} moved from {details['from']} to {details['to']}"
+        if event_type == 'ap_roamed':
+            return f"{name} roamed from {details['from']} to {details['to']}"
+        return f"{name} signal dropped from {details['from']:.0f} to {details['to']:.0f} dBm"
+    
+    def on_snapshot(self, snapshot):
+        """Snapshot listener: diff a fresh snapshot against the previous one"""
+        if not snapshot_is_fresh(snapshot):
+            return
+        max_events, degraded_dbm, drop_db, spill = self.settings()
+        current = self.index(snapshot.combined.get('devices', []))
+        
+        with self.lock:
+            previous, self.previous = self.previous, current
+            if previous is None:
+                # First snapshot only sets the baseline
+                return
+            changes = self.diff(previous, current, refreshed_network_ids(snapshot), degraded_dbm, drop_db)
+            
+            timestamp = snapshot.combined.get('last_update')
+            events = []
+            for event_type, mac, state, details in changes:
+                event = {
+                    'id': self.next_id,
+                    'type': event_type,
+                    'timestamp': timestamp,
+                    'mac': mac,
+                    'device_name': state[0],
+                    'network_id': state[1],
+                    'description': self.describe(event_type, state[0], details)
+                }
+                event.update(details)
+                events.append(event)
+                self.next_id += 1
+            
+            if self.log.maxlen != max_events:
+                self.log = deque(self.log, maxlen=max_events)
+            self.log.extend(events)
+        
+        if events and spill:
+            self.spill(events)
+    
+    def spill(self, events):
+        """Append events to EVENTS_FILE, rotating it at EVENTS_FILE_MAX_BYTES"""
+        try:
+            if EVENTS_FILE.exists() and EVENTS_FILE.stat().st_size > EVENTS_FILE_MAX_BYTES:
+                os.replace(EVENTS_FILE, EVENTS_FILE.with_name(EVENTS_FILE.name + '.1'))
+            with open(EVENTS_FILE, 'a') as f:
+                for event in events:
+                    f.write(json.dumps(event, separators=(',', ':')) + '\n')
+        except Exception as e:
+            logging.error("Event spill error: " + str(e))
+    
+    def recent(self, limit=10, event_types=None):
+        """Get the newest events first, optionally filtered by type"""
+        with self.lock:
+            events = list(self.log)
+        if event_types:
+            events = [e for e in events if e['type'] in event_types]
+        return events[::-1][:limit]
+
+event_engine = EventEngine()
+add_snapshot_listener(event_engine.on_snapshot)
+
+# Push updates
+STREAM_KEEPALIVE_SECONDS = 15
+STREAM_RETRY_MS = 5000
+
+class SnapshotBroadcaster:
+    """Wakes Server-Sent Events clients when a new snapshot is published
+    
+    Messages only announce the new version; clients then fetch
+    /api/dashboard?since=, which serves a gzipped delta built once per
+    snapshot instead of pushing the full data to every kiosk.
+    """
+    
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.version = 0
+        self.clients = 0
+    
+    def on_snapshot(self, snapshot):
+        """Snapshot listener: wake every waiting stream"""
+        with self.condition:
+            self.version = snapshot.version
+            self.condition.notify_all()
+    
+    def wait(self, version, timeout=STREAM_KEEPALIVE_SECONDS):
+        """Block until a snapshot newer than version is published or timeout"""
+        with self.condition:
+            self.condition.wait_for(lambda: self.version != version, timeout)
+            return self.version
+    
+    @staticmethod
+    def snapshot_message(snapshot):
+        """Get the SSE message announcing a snapshot"""
+        data = json.dumps({'version': snapshot.version, 'epoch': SNAPSHOT_EPOCH}, separators=(',', ':'))
+        return f"id: {snapshot.version}\nevent: snapshot\ndata: {data}\n\n"
+    
+    def stream(self):
+        """Generate the SSE stream for one client"""
+        with self.condition:
+            self.clients += 1
+        try:
+            yield f"retry: {STREAM_RETRY_MS}\n\n"
+            sent = 0  # the idle snapshot before the first publish is never sent
+            while True:
+                snapshot = get_snapshot()
+                if snapshot.version != sent and snapshot.version > 0:
+                    yield self.snapshot_message(snapshot)
+                    sent = snapshot.version
+                else:
+                    yield ": keepalive\n\n"
+                self.wait(sent)
+        finally:
+            with self.condition:
+                self.clients -= 1
+
+snapshot_broadcaster = SnapshotBroadcaster()
+add_snapshot_listener(snapshot_broadcaster.on_snapshot)
+
+# Delta responses
+DELTA_VERSIONS = 30  # snapshots a client can be behind and still get a delta
+DELTA_SERIES = ('connected_users', 'signal_strength_avg')
+SNAPSHOT_EPOCH = str(int(time.time()))  # versions restart with the process
+
+def dashboard_payload(snapshot):
+    """Get the full /api/dashboard response for a snapshot"""
+    return dict(snapshot.combined, version=snapshot.version, epoch=SNAPSHOT_EPOCH,
+                history_seconds=history_sampler.width * history_sampler.capacity)
+
+class SnapshotDeltas:
+    """Compact differences between recent snapshots for ?since= requests
+    
+    Only a fingerprint of each recent snapshot is kept (a hash per device and
+    the newest point of each chart series), so keeping many versions costs
+    far less than keeping the snapshots themselves. Deltas are computed once
+    per (base, target) pair and shared by every client on the same base.
+    """
+    
+    def __init__(self, max_versions=DELTA_VERSIONS):
+        self.lock = threading.Lock()
+        self.fingerprints = {}  # version -> fingerprint, oldest first
+        self.max_versions = max_versions
+        self.deltas = {}        # (base, target) -> delta
+    
+    @staticmethod
+    def fingerprint(snapshot):
+        """Get {mac: hash} and the newest series timestamps of a snapshot
+        
+        Returns None when MACs are not unique, since devices could not be
+        matched up between versions.
+        """
+        combined = snapshot.combined
+        devices = {}
+        for device in combined.get('devices', []):
+            devices[device[DEVICE_MAC]] = hash(device)
+        if len(devices) != len(combined.get('devices', [])):
+            return None
+        history = {}
+        for key in DELTA_SERIES:
+            points = combined.get(key) or []
+            history[key] = points[-1]['timestamp'] if points else None
+        return {'devices': devices, 'history': history}
+    
+    def _fingerprint_for(self, snapshot):
+        if snapshot.version not in self.fingerprints:
+            self.fingerprints[snapshot.version] = self.fingerprint(snapshot)
+            while len(self.fingerprints) > self.max_versions:
+                del self.fingerprints[next(iter(self.fingerprints))]
+        return self.fingerprints[snapshot.version]
+    
+    def on_snapshot(self, snapshot):
+        """Snapshot listener: fingerprint the new version and drop old deltas"""
+        with self.lock:
+            self._fingerprint_for(snapshot)
+            self.deltas = {key: delta for key, delta in self.deltas.items() if key[1] == snapshot.version}
+    
+    def delta(self, snapshot, since):
+        """Get the delta from version `since` to snapshot, or None if it has expired"""
+        with self.lock:
+            key = (since, snapshot.version)
+            if key in self.deltas:
+                return self.deltas[key]
+            base = self.fingerprints.get(since)
+            target = self._fingerprint_for(snapshot)
+            if base is None or target is None or since > snapshot.version:
+                return None
+            delta = self.build(snapshot, since, base, target)
+            self.deltas[key] = delta
+            return delta
+    
+    @staticmethod
+    def build(snapshot, since, base, target):
+        """Build the delta between a base fingerprint and a snapshot"""
+        combined = snapshot.combined
+        
+        # Chart series: points from the base's newest bucket on, since that
+        # bucket may have been updated in place
+        history = {}
+        for key in DELTA_SERIES:
+            points = combined.get(key) or []
+            base_last = base['history'][key]
+            timestamps = [point['timestamp'] for point in points]
+            if base_last is None or base_last not in timestamps:
+                history[key] = {'points': points, 'length': len(points), 'replace': True}
+            else:
+                history[key] = {'points': points[timestamps.index(base_last):], 'length': len(points)}
+        
+        base_devices = base['devices']
+        target_devices = target['devices']
+        added = []
+        changed = []
+        for device in combined.get('devices', []):
+            mac = device[DEVICE_MAC]
+            if mac not in base_devices:
+                added.append(device)
+            elif base_devices[mac] != target_devices[mac]:
+                changed.append(device)
+        removed = [mac for mac in base_devices if mac not in target_devices]
+        
+        return {
+            'delta': True,
+            'since': since,
+            'version': snapshot.version,
+            'epoch': SNAPSHOT_EPOCH,
+            'fields': {key: value for key, value in combined.items()
+                       if key != 'devices' and key not in DELTA_SERIES},
+            'history': history,
+            'devices': {'added': DeviceTable(added), 'changed': DeviceTable(changed), 'removed': removed}
+        }
+
+snapshot_deltas = SnapshotDeltas()
+add_snapshot_listener(snapshot_deltas.on_snapshot)
+
+# Pre-serialized responses
+RESPONSE_GZIP_LEVEL = 6
+
+class CachedBody:
+    """One JSON response body, serialized and compressed once"""
+    __slots__ = ('raw', 'gzipped', 'etag')
+    
+    def __init__(self, data, compresslevel=RESPONSE_GZIP_LEVEL):
+        self.raw = json.dumps(data, separators=(',', ':'), default=json_default).encode('utf-8')
+        self.gzipped = gzip.compress(self.raw, compresslevel)
+        self.etag = hashlib.blake2b(self.raw, digest_size=16).hexdigest()
+
+class ResponseCache:
+    """JSON response bodies built once per snapshot and served as bytes
+    
+    Each registered response has a build(snapshot, *args) function and an
+    optional key(snapshot, *args) for anything else it depends on (config
+    revision, tokens, query parameters). Bodies for the current snapshot are
+    kept raw and gzipped with a strong ETag, so a repeat request costs a dict
+    lookup, or a 304 when the client already has it. Responses registered
+    with warm=True are built as soon as a snapshot is published.
+    """
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.responses = {}  # name -> (build, key, warm)
+        self.bodies = {}     # (name, version, key) -> CachedBody
+    
+    def register(self, name, build, key=None, warm=True):
+        self.responses[name] = (build, key, warm)
     
+    def body(self, name, snapshot, *args):
+        """Get the cached body of a response, building it on first use"""
+        build, key, _ = self.responses[name]
+        cache_key = (name, snapshot.version, key(snapshot, *args) if key else None)
+        with self.lock:
+            body = self.bodies.get(cache_key)
+        if body is None:
+            body = CachedBody(build(snapshot, *args))
+            with self.lock:
+                body = self.bodies.setdefault(cache_key, body)
+        return body
+    
+    def on_snapshot(self, snapshot):
+        """Snapshot listener: drop bodies of older snapshots and warm the new ones"""
+        with self.lock:
+            self.bodies = {cache_key: body for cache_key, body in self.bodies.items()
+                           if cache_key[1] == snapshot.version}
+        for name, (build, key, warm) in list(self.responses.items()):
+            if warm:
+                try:
+                    self.body(name, snapshot)
+                except Exception as e:
+                    logging.error(f"Response cache {name} error: {str(e)}")
+    
+    def respond(self, name, snapshot, *args):
+        """Serve a cached response, honoring If-None-Match and Accept-Encoding"""
+        body = self.body(name, snapshot, *args)
+        use_gzip = request.accept_encodings['gzip'] > 0
+        # Each encoding is its own representation and gets its own strong ETag
+        etag = body.etag + '-gzip' if use_gzip else body.etag
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        elif use_gzip:
+            response = Response(body.gzipped, mimetype='application/json')
+            response.headers['Content-Encoding'] = 'gzip'
+        else:
+            response = Response(body.raw, mimetype='application/json')
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        response.vary.add('Accept-Encoding')
+        return response
+
+response_cache = ResponseCache()
+add_snapshot_listener(response_cache.on_snapshot)
+
+# In-memory chart history
+DEFAULT_HISTORY_BUCKET_SECONDS = 300   # one chart point per 5 minutes...
+DEFAULT_HISTORY_POINTS = 168           # ...for 14 hours; longer ranges come from the history store
+
+class BucketedSeries:
+    """Fixed wall-clock buckets holding count/sum/min/max of one metric
+    
+    However often samples arrive, each bucket covers the same span of time
+    and at most `capacity` buckets are kept, so memory per series is fixed.
+    """
+    __slots__ = ('width', 'buckets', 'rendered', 'rendered_as')
+    
+    def __init__(self, width, capacity):
+        self.width = width
+        self.buckets = deque(maxlen=capacity)  # [start, count, total, min, max]
+        self.rendered = deque()                # (start, point) for points()
+        self.rendered_as = None
+    
+    def merge(self, ts, count, total, vmin, vmax):
+        """Fold pre-aggregated samples into the bucket containing ts"""
+        start = int(ts) - int(ts) % self.width
+        if self.buckets and self.buckets[-1][0] >= start:
+            # Late or same-bucket samples fold into the newest bucket
+            bucket = self.buckets[-1]
+            bucket[1] += count
+            bucket[2] += total
+            bucket[3] = min(bucket[3], vmin)
+            bucket[4] = max(bucket[4], vmax)
+        else:
+            self.buckets.append([start, count, total, vmin, vmax])
+    
+    def add(self, ts, value):
+        self.merge(ts, 1, value, value, value)
+    
+    def points(self, key, tz, digits=None):
+        """Get the buckets as dashboard series points
+        
+        Only the newest bucket can still change, so older buckets' points
+        are formatted once and reused by later calls.
+        """
+        rendered = self.rendered
+        if self.rendered_as != (key, tz, digits):
+            rendered.clear()
+            self.rendered_as = (key, tz, digits)
+        if rendered:
+            rendered.pop()
+        oldest = self.buckets[0][0] if self.buckets else None
+        while rendered and rendered[0][0] < oldest:
+            rendered.popleft()
+        for start, count, total, vmin, vmax in islice(self.buckets, len(rendered), None):
+            rendered.append((start, {
+                'timestamp': datetime.fromtimestamp(start, tz).isoformat(),
+                key: round(total / count, digits),
+                'min': vmin,
+                'max': vmax,
+                'samples': count
+            }))
+        return [point for start, point in rendered]
+
+class HistorySampler:
+    """Bucketed chart history for every (series, metric) pair
+    
+    Series are seeded from the previous snapshot's points the first time
+    they are seen, so history restored from DATA_CACHE_FILE (or written
+    before bucketing existed) carries over.
+    """
+    
+    METRIC_KEYS = {'connected_users': ('count', None), 'signal_strength_avg': ('avg_dbm', 1)}
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.series = {}
+        self.width = DEFAULT_HISTORY_BUCKET_SECONDS
+        self.capacity = DEFAULT_HISTORY_POINTS
+    
+    def configure(self):
+        """Apply the 'history' config section, re-bucketing if it changed"""
+        history = get_config().get('history', {})
+        try:
+            width = max(60, int(history.get('bucket_seconds', DEFAULT_HISTORY_BUCKET_SECONDS)))
+            capacity = max(1, int(history.get('max_points', DEFAULT_HISTORY_POINTS)))
+        except (TypeError, ValueError):
+            width, capacity = DEFAULT_HISTORY_BUCKET_SECONDS, DEFAULT_HISTORY_POINTS
+        if (width, capacity) == (self.width, self.capacity):
+            return
+        for key, old in self.series.items():
+            series = BucketedSeries(width, capacity)
+            for start, count, total, vmin, vmax in old.buckets:
+                series.merge(start, count, total, vmin, vmax)
+            self.series[key] = series
+        self.width, self.capacity = width, capacity
+    
+    def _seed(self, series, metric, points):
+        value_key = self.METRIC_KEYS[metric][0]
+        for point in points:
+            try:
+                ts = datetime.fromisoformat(point['timestamp']).timestamp()
+                value = point[value_key]
+                count = point.get('samples', 1)
+                series.merge(ts, count, value * count, point.get('min', value), point.get('max', value))
+            except (KeyError, TypeError, ValueError):
+                continue
+    
+    def observe(self, key, ts, value, previous_points=()):
+        """Add a sample and get the series' points for the new snapshot
+        
+        key is (series id, metric); previous_points seeds an unseen series.
+        """
+        metric = key[1]
+        value_key, digits = self.METRIC_KEYS[metric]
+        with self.lock:
+            self.configure()
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = BucketedSeries(self.width, self.capacity)
+                self._seed(series, metric, previous_points)
+            series.add(ts, value)
+            return series.points(value_key, config_provider.timezone(), digits)
+
+history_sampler = HistorySampler()
+
+class Diagnostics:
+    """Opt-in structured dumps of upstream payloads for troubleshooting
+    
+    Off by default. When enabled through the 'diagnostics' config section,
+    records are sampled and rate limited per minute, and a payload is only
+    serialized after a record has passed every check, so a disabled or
+    throttled record costs a couple of comparisons.
+    """
+    
+    DEFAULT_SETTINGS = {
+        'enabled': False,
+        'sample_rate': 0.05,            # fraction of records kept
+        'max_records_per_minute': 60,
+        'categories': ['eero', 'device', 'unassigned']
+    }
+    
+    def __init__(self):
+        self.logger = logging.getLogger('eero.diagnostics')
+        self.lock = threading.Lock()
+        self.enabled = False
+        self.sample_rate = 0.0
+        self.rate_per_minute = 0
+        self.categories = frozenset()
+        self.tokens = 0.0
+        self.last_refill = time.monotonic()
+        self.counters = {'emitted': 0, 'sampled_out': 0, 'rate_limited': 0}
+    
+    def configure(self, settings):
+        """Apply the 'diagnostics' config section"""
+        merged = dict(self.DEFAULT_SETTINGS)
+        merged.update(settings or {})
+        with self.lock:
+            was_enabled = self.enabled
+            self.enabled = bool(merged['enabled'])
+            self.sample_rate = min(1.0, max(0.0, float(merged['sample_rate'])))
+            self.rate_per_minute = max(0, int(merged['max_records_per_minute']))
+            self.categories = frozenset(merged['categories'])
+            # Start with a full bucket when diagnostics are switched on
+            self.tokens = self.rate_per_minute if not was_enabled else min(self.tokens, self.rate_per_minute)
+        self.logger.setLevel(logging.DEBUG if self.enabled else logging.WARNING)
+    
+    def wants(self, category):
+        """Cheap pre-check so callers can skip building a record entirely"""
+        return self.enabled and category in self.categories and self.logger.isEnabledFor(logging.DEBUG)
+    
+    def record(self, category, message, payload=None):
+        """Log one diagnostics record if it survives sampling and rate limits
+        
+        payload may be any JSON-serializable object, or a callable returning
+        one; it is only built and serialized when the record is written.
+        """
+        if not self.wants(category):
+            return
+        
+        with self.lock:
+            if random.random() >= self.sample_rate:
+                self.counters['sampled_out'] += 1
+                return
+            
+            now = time.monotonic()
+            self.tokens = min(self.rate_per_minute,
+                              self.tokens + (now - self.last_refill) * self.rate_per_minute / 60.0)
+            self.last_refill = now
+            if self.tokens < 1:
+                self.counters['rate_limited'] += 1
+                return
+            self.tokens -= 1
+            self.counters['emitted'] += 1
+        
+        if callable(payload):
+            payload = payload()
+        body = json.dumps(payload, separators=(',', ':'), default=str) if payload is not None else ''
+        self.logger.debug(f"diag[{category}] {message} {body}")
+    
+    def status(self):
+        """Get diagnostics settings and counters for health reporting"""
+        with self.lock:
+            return dict(self.counters, enabled=self.enabled, sample_rate=self.sample_rate)
+
+diagnostics = Diagnostics()
+
+# Metrics
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 15, 30)  # seconds
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)  # bytes
+
+class MetricFamily:
+    """One named metric with a series per label set
+    
+    Series are plain lists allocated once per label set: a counter or gauge
+    holds [value], a histogram holds one cumulative-ready count per bucket
+    plus +Inf, then sum and count. Updates are a bisect and a few additions
+    under the family's lock.
+    """
+    
+    def __init__(self, name, kind, help_text, labels=(), buckets=None):
+        self.name = name
+        self.kind = kind            # 'counter', 'gauge' or 'histogram'
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets) if buckets else None
+        self.size = len(self.buckets) + 3 if self.buckets else 1
+        self.lock = threading.Lock()
+        self.series = {}            # label values tuple -> list
+    
+    def _series(self, label_values):
+        series = self.series.get(label_values)
+        if series is None:
+            series = self.series[label_values] = [0] * self.size
+        return series
+    
+    def clear(self):
+        """Drop every series, e.g. before a collector sets the current ones"""
+        with self.lock:
+            self.series = {}
+    
+    def inc(self, *label_values, amount=1):
+        with self.lock:
+            self._series(label_values)[0] += amount
+    
+    def set(self, value, *label_values):
+        with self.lock:
+            self._series(label_values)[0] = value
+    
+    def observe(self, value, *label_values):
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            series = self._series(label_values)
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+    
+    @staticmethod
+    def _format_labels(names, values, extra=None):
+        pairs = [f'{name}="{escape_label_value(value)}"' for name, value in zip(names, values)]
+        if extra:
+            pairs.append(extra)
+        return '{' + ','.join(pairs) + '}' if pairs else ''
+    
+    def render(self, lines):
+        """Append this family in the Prometheus text format"""
+        with self.lock:
+            series = [(label_values, list(values)) for label_values, values in self.series.items()]
+        if not series:
+            return
+        lines.append(f"# HELP {self.name} {self.help}")
+        lines.append(f"# TYPE {self.name} {self.kind}")
+        for label_values, values in series:
+            if self.kind != 'histogram':
+                lines.append(f"{self.name}{self._format_labels(self.labels, label_values)} {format_metric_value(values[0])}")
+                continue
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), values):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{self._format_labels(self.labels, label_values, le)} {cumulative}")
+            labels = self._format_labels(self.labels, label_values)
+            lines.append(f"{self.name}_sum{labels} {format_metric_value(values[-2])}")
+            lines.append(f"{self.name}_count{labels} {values[-1]}")
+
+def escape_label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def format_metric_value(value):
+    return repr(round(value, 6)) if isinstance(value, float) else str(value)
+
+class MetricsRegistry:
+    """Counters, gauges and histograms exposed on /metrics
+    
+    A small stand-in for a Prometheus client library. Gauges that describe
+    the current snapshot are registered as collector callables and computed
+    only when /metrics is scraped.
+    """
+    
+    def __init__(self):
+        self.families = []
+        self.collectors = []
+    
+    def _add(self, family):
+        self.families.append(family)
+        return family
+    
+    def counter(self, name, help_text, labels=()):
+        return self._add(MetricFamily(name, 'counter', help_text, labels))
+    
+    def gauge(self, name, help_text, labels=()):
+        return self._add(MetricFamily(name, 'gauge', help_text, labels))
+    
+    def histogram(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        return self._add(MetricFamily(name, 'histogram', help_text, labels, buckets))
+    
+    def add_collector(self, collector):
+        """Register a callable run before every render to update gauges"""
+        self.collectors.append(collector)
+        return collector
+    
+    def render(self):
+        """Get all metrics in the Prometheus text exposition format"""
+        for collector in self.collectors:
+            try:
+                collector()
+            except Exception as e:
+                logging.error(f"Metrics collector {getattr(collector, '__name__', collector)} error: {str(e)}")
+        lines = []
+        for family in self.families:
+            family.render(lines)
+        return '\n'.join(lines) + '\n'
+
+metrics = MetricsRegistry()
+upstream_seconds = metrics.histogram(
+    'eero_upstream_request_seconds', 'eero API call latency', ('network', 'endpoint'))
+upstream_errors = metrics.counter(
+    'eero_upstream_errors_total', 'Failed eero API calls', ('network', 'endpoint', 'reason'))
+refresh_seconds = metrics.histogram('eero_refresh_seconds', 'Duration of a whole cache refresh')
+refresh_stage_seconds = metrics.histogram(
+    'eero_refresh_stage_seconds', 'Time spent per cache refresh stage', ('stage',))
+refresh_errors = metrics.counter('eero_refresh_errors_total', 'Cache refreshes that failed')
+devices_processed = metrics.counter(
+    'eero_devices_processed_total', 'Connected devices processed by cache refreshes', ('network',))
+listener_errors = metrics.counter(
+    'eero_snapshot_listener_errors_total', 'Snapshot listeners that raised', ('listener',))
+http_request_seconds = metrics.histogram(
+    'eero_http_request_seconds', 'Dashboard request latency', ('route', 'method', 'status'))
+http_response_bytes = metrics.histogram(
+    'eero_http_response_bytes', 'Dashboard response body size', ('route',), buckets=SIZE_BUCKETS)
+http_errors = metrics.counter(
+    'eero_http_errors_total', 'Dashboard responses with a 5xx status', ('route',))
+snapshot_age = metrics.gauge('eero_snapshot_age_seconds', 'Seconds since the current snapshot was published')
+snapshot_version = metrics.gauge('eero_snapshot_version', 'Version of the current snapshot')
+network_devices = metrics.gauge('eero_network_devices', 'Connected devices in the current snapshot', ('network',))
+network_aps = metrics.gauge('eero_network_access_points', 'Access points in the current snapshot', ('network',))
+
+def collect_snapshot_metrics():
+    """Update the gauges that describe the current snapshot"""
+    snapshot = get_snapshot()
+    snapshot_version.set(snapshot.version)
+    if snapshot.built_at:
+        snapshot_age.set(round(time.time() - snapshot.built_at, 3))
+    network_devices.clear()
+    network_aps.clear()
+    for network_id, network_cache in snapshot.networks.items():
+        network_devices.set(len(network_cache.get('devices', [])), network_id)
+        network_aps.set(len(network_cache.get('ap_data', {})), network_id)
+
+metrics.add_collector(collect_snapshot_metrics)
+
+# Device OS classification
+# Rules are checked in order and the first match wins. 'manufacturer' rules
+# look at the manufacturer only, 'text' rules at "manufacturer hostname".
+DEFAULT_DEVICE_OS_RULES = [
+    # Amazon detection (prioritize manufacturer field)
+    {'os': 'Amazon', 'match': 'manufacturer', 'keywords': ['amazon', 'amazon technologies']},
+    {'os': 'Amazon', 'match': 'text', 'keywords': ['echo', 'alexa', 'fire tv', 'kindle']},
+    # Apple/iOS detection
+    {'os': 'iOS', 'match': 'manufacturer', 'keywords': ['apple', 'apple inc']},
+    {'os': 'iOS', 'match': 'text', 'keywords': ['iphone', 'ipad', 'mac', 'ios', 'apple']},
+    # Android detection (includes many manufacturers)
+    {'os': 'Android', 'match': 'manufacturer', 'keywords': ['samsung', 'google', 'lg electronics', 'htc', 'sony', 'motorola', 'huawei', 'xiaomi', 'oneplus']},
+    {'os': 'Android', 'match': 'text', 'keywords': ['android', 'pixel', 'galaxy']},
+    # Windows detection
+    {'os': 'Windows', 'match': 'manufacturer', 'keywords': ['microsoft', 'dell', 'hp', 'lenovo', 'asus', 'acer', 'msi']},
+    {'os': 'Windows', 'match': 'text', 'keywords': ['windows', 'microsoft', 'surface']},
+    # Gaming consoles and other specific devices
+    {'os': 'Gaming', 'match': 'manufacturer', 'keywords': ['sony computer entertainment', 'nintendo']},
+    {'os': 'Gaming', 'match': 'text', 'keywords': ['playstation', 'xbox', 'nintendo', 'steam deck']},
     # Smart TV and streaming devices
-    elif any(k in manufacturer for k in ['roku', 'nvidia', 'chromecast']):
-        return 'Streaming'
-    elif any(k in text for k in ['roku', 'chromecast', 'nvidia shield', 'apple tv']):
-        return 'Streaming'
+    {'os': 'Streaming', 'match': 'manufacturer', 'keywords': ['roku', 'nvidia', 'chromecast']},
+    {'os': 'Streaming', 'match': 'text', 'keywords': ['roku', 'chromecast', 'nvidia shield', 'apple tv']}
+]
+DEFAULT_DEVICE_OS = 'Other'
+DEFAULT_DEVICE_OS_CACHE_SIZE = 4096
+
+class DeviceOSClassifier:
+    """Keyword rules compiled once into regexes, with memoized results
     
-    else:
-        return 'Other'
+    Each rule's keywords become one alternation regex, searched in rule
+    order so the first matching rule still wins. Results are cached per
+    (manufacturer, hostname) in a bounded LRU, since the same devices are
+    classified again on every refresh.
+    """
+    
+    def __init__(self, rules=None, cache_size=DEFAULT_DEVICE_OS_CACHE_SIZE):
+        self.rules = None
+        self.cache_size = None
+        self.configure({'rules': rules, 'cache_size': cache_size})
+    
+    @staticmethod
+    def compile(rules):
+        """Get (os, matches_manufacturer_only, search) per rule that has keywords"""
+        return [(rule['os'], rule['match'] == 'manufacturer',
+                 re.compile('|'.join(re.escape(k.lower()) for k in rule['keywords'])).search)
+                for rule in rules if rule['keywords']]
+    
+    @staticmethod
+    def validate(rules):
+        """Get rules as a list of well-formed rule dicts, or raise ValueError"""
+        if not isinstance(rules, list) or not rules:
+            raise ValueError("rules must be a non-empty list")
+        valid = []
+        for rule in rules:
+            if (not isinstance(rule, dict) or rule.get('match') not in ('manufacturer', 'text')
+                    or not isinstance(rule.get('os'), str)
+                    or not isinstance(rule.get('keywords'), list)
+                    or not all(isinstance(k, str) for k in rule['keywords'])):
+                raise ValueError(f"invalid rule {rule!r}")
+            valid.append({'os': rule['os'], 'match': rule['match'], 'keywords': list(rule['keywords'])})
+        return valid
+    
+    def configure(self, settings):
+        """Apply the 'device_os' config section, recompiling only if it changed"""
+        settings = settings or {}
+        rules = settings.get('rules') or DEFAULT_DEVICE_OS_RULES
+        try:
+            rules = self.validate(rules)
+        except ValueError as e:
+            logging.warning(f"Invalid device_os rules, using defaults: {str(e)}")
+            rules = DEFAULT_DEVICE_OS_RULES
+        try:
+            cache_size = max(0, int(settings.get('cache_size', DEFAULT_DEVICE_OS_CACHE_SIZE)))
+        except (TypeError, ValueError):
+            cache_size = DEFAULT_DEVICE_OS_CACHE_SIZE
+        if rules == self.rules and cache_size == self.cache_size:
+            return
+        self.rules = rules
+        self.cache_size = cache_size
+        self.patterns = self.compile(rules)
+        self.classify = lru_cache(maxsize=cache_size)(self._classify)
+    
+    def _classify(self, manufacturer, hostname):
+        """Classify lowercased manufacturer and hostname strings"""
+        text = manufacturer + " " + hostname
+        for device_os, manufacturer_only, search in self.patterns:
+            if search(manufacturer if manufacturer_only else text):
+                return device_os
+        return DEFAULT_DEVICE_OS
+    
+    def stats(self):
+        info = self.classify.cache_info()
+        return {'rules': len(self.rules), 'cache_hits': info.hits, 'cache_misses': info.misses,
+                'cache_entries': info.currsize}
+
+device_os_classifier = DeviceOSClassifier()
+
+def detect_device_os(device):
+    """Detect device OS from manufacturer and hostname"""
+    return device_os_classifier.classify(str(device.get('manufacturer', '')).lower(),
+                                         str(device.get('hostname', '')).lower())
 
 def parse_frequency(interface_info):
     """Parse frequency information"""
@@ -226,13 +1837,255 @@ def get_signal_quality(signal_dbm):
     except:
         return 'Unknown'
 
+# AP assignment
+AP_MATCH_FIELDS = ('ap_mac', 'access_point', 'connected_eero', 'parent_eero')
+MAX_AP_INDEX_LOCATIONS = 4096
+
+class APIndex:
+    """Lookup tables for finding the AP a wireless device is connected to
+    
+    Built once per network topology, so assigning a device is a few dict
+    lookups instead of a scan over every AP. Methods are tried in the same
+    order as always: the device's source (location contained in an AP name,
+    or source URL), interface eero_url, BSSID, then other interface fields.
+    A source location matches the first AP, in ap_data order, whose name
+    contains it; that answer is memoized per location.
+    """
+    
+    def __init__(self, ap_data, bssid_to_ap):
+        self.signature = self.topology(ap_data, bssid_to_ap)
+        self.ap_ids = list(ap_data)
+        self.names = [ap_info['name'].lower() for ap_info in ap_data.values()]
+        self.positions = {ap_id: position for position, ap_id in enumerate(self.ap_ids)}
+        self.bssid_to_ap = dict(bssid_to_ap)
+        self.locations = {}  # lowercased source location -> first matching position or None
+    
+    @staticmethod
+    def topology(ap_data, bssid_to_ap):
+        """Get what an index depends on, to tell whether it can be reused"""
+        return (tuple((ap_id, ap_info['name']) for ap_id, ap_info in ap_data.items()),
+                tuple(bssid_to_ap.items()))
+    
+    def location_position(self, location):
+        """Get the position of the first AP whose name contains location"""
+        location = location.lower()
+        if location not in self.locations:
+            if len(self.locations) >= MAX_AP_INDEX_LOCATIONS:
+                self.locations.clear()
+            self.locations[location] = next(
+                (position for position, name in enumerate(self.names) if location in name), None)
+        return self.locations[location]
+    
+    def match(self, device, interface_info):
+        """Get (ap_id, method) for a wireless device, or (None, None)"""
+        # Method 0: the device's 'source' field
+        device_source = device.get('source', {})
+        if device_source and isinstance(device_source, dict) and self.ap_ids:
+            source_location = device_source.get('location', '')
+            source_url = device_source.get('url', '')
+            location_position = None
+            url_position = None
+            if source_location and isinstance(source_location, str):
+                location_position = self.location_position(source_location)
+            if source_url and isinstance(source_url, str):
+                url_position = self.positions.get(source_url)
+            # Whichever matches the earlier AP wins; location first on a tie
+            if location_position is not None and (url_position is None or location_position <= url_position):
+                return self.ap_ids[location_position], 'source location'
+            if url_position is not None:
+                return self.ap_ids[url_position], 'source URL'
+        
+        # Method 1: direct eero_url
+        eero_url = interface_info.get('eero_url') or interface_info.get('eero')
+        if eero_url and eero_url in self.positions:
+            return eero_url, 'eero_url'
+        
+        # Method 2: BSSID matching
+        bssid = interface_info.get('bssid', '').lower()
+        if bssid and bssid in self.bssid_to_ap:
+            return self.bssid_to_ap[bssid], 'BSSID'
+        
+        # Method 3: other interface fields
+        for field in AP_MATCH_FIELDS:
+            if field in interface_info:
+                field_value = str(interface_info[field]).lower()
+                if field_value in self.bssid_to_ap:
+                    return self.bssid_to_ap[field_value], field
+        
+        return None, None
+
+_ap_indexes = {}  # network_id -> APIndex
+
+def get_ap_index(network_id, ap_data, bssid_to_ap):
+    """Get the AP index for a network, rebuilding it only when the topology changed"""
+    ap_index = _ap_indexes.get(network_id)
+    if ap_index is None or ap_index.signature != APIndex.topology(ap_data, bssid_to_ap):
+        ap_index = APIndex(ap_data, bssid_to_ap)
+        _ap_indexes[network_id] = ap_index
+    return ap_index
+
+DEFAULT_FETCH_CONCURRENCY = 8  # parallel upstream calls per refresh
+MAX_FETCH_CONCURRENCY = 32
+
+def get_fetch_concurrency():
+    """Get configured limit for parallel upstream calls"""
+    try:
+        polling = get_config().get('polling', {})
+        limit = int(polling.get('max_concurrency', DEFAULT_FETCH_CONCURRENCY))
+        return min(MAX_FETCH_CONCURRENCY, max(1, limit))
+    except Exception as e:
+        logging.warning("Invalid fetch concurrency, using default: " + str(e))
+        return DEFAULT_FETCH_CONCURRENCY
+
+def eero_api_root(api_url):
+    """Get the eero API root URL for the configured api_url
+    
+    A bare host uses HTTPS; an api_url with a scheme (e.g.
+    "http://127.0.0.1:8765" for mock_eero_server.py) is used as given.
+    """
+    api_url = str(api_url).strip().rstrip('/')
+    return api_url if '://' in api_url else "https://" + api_url
+
+# Upstream retries and per-network circuit breakers
+DEFAULT_UPSTREAM_SETTINGS = {
+    'timeout_seconds': 15,        # per eero API call
+    'retries': 2,                 # extra attempts after a transient failure
+    'retry_base_seconds': 0.5,    # first backoff; doubles per attempt
+    'retry_max_seconds': 8,       # longest backoff, and longest Retry-After honored
+    'failure_threshold': 3,       # consecutive failed fetches that open a network's breaker
+    'cooldown_seconds': 60,       # first cool-down; doubles per further failure
+    'max_cooldown_seconds': 900
+}
+TRANSIENT_STATUS_CODES = frozenset([429, 500, 502, 503, 504])
+
+def get_upstream_settings():
+    """Get the 'upstream' config section merged over the defaults"""
+    settings = dict(DEFAULT_UPSTREAM_SETTINGS)
+    try:
+        for key, value in get_config().get('upstream', {}).items():
+            if key in settings:
+                settings[key] = max(0.0, float(value))
+    except Exception as e:
+        logging.warning("Invalid upstream settings, using defaults: " + str(e))
+        settings = dict(DEFAULT_UPSTREAM_SETTINGS)
+    settings['timeout_seconds'] = max(1.0, settings['timeout_seconds'])
+    settings['failure_threshold'] = max(1, int(settings['failure_threshold']))
+    return settings
+
+def retry_delay(error, attempt, settings):
+    """Get seconds to wait before retrying a failed call, or None not to retry
+    
+    Timeouts, connection errors, 429 and 5xx are retried after an
+    exponential backoff with jitter, so networks that failed together
+    don't retry in lockstep. A 429's Retry-After is honored when it is
+    no longer than retry_max_seconds; otherwise the call is not retried.
+    """
+    if isinstance(error, requests.HTTPError):
+        status = error.response.status_code if error.response is not None else None
+        if status not in TRANSIENT_STATUS_CODES:
+            return None
+    elif not isinstance(error, (requests.Timeout, requests.ConnectionError)):
+        return None
+    
+    backoff = min(settings['retry_max_seconds'], settings['retry_base_seconds'] * 2 ** attempt)
+    delay = random.uniform(backoff / 2, backoff)
+    if isinstance(error, requests.HTTPError) and error.response.status_code == 429:
+        try:
+            retry_after = float(error.response.headers.get('Retry-After', 0))
+        except (TypeError, ValueError):
+            retry_after = 0
+        if retry_after > settings['retry_max_seconds']:
+            return None
+        delay = max(delay, retry_after)
+    return delay
+
+class CircuitBreaker:
+    """Health of one network's upstream fetches
+    
+    Closed: fetches go ahead. After failure_threshold consecutive failed
+    fetches the breaker opens and the network is skipped until its
+    cool-down ends; the cool-down doubles with every further failure up to
+    max_cooldown_seconds, with jitter. The first fetch after a cool-down is
+    a half-open probe: success closes the breaker, failure reopens it.
+    """
+    
+    def __init__(self, network_id):
+        self.network_id = network_id
+        self.lock = threading.Lock()
+        self.state = 'closed'
+        self.failures = 0           # consecutive failed fetches
+        self.open_until = None      # epoch seconds
+        self.last_error = None
+        self.last_failure = None
+        self.last_success = None
+        self.skipped = 0
+    
+    def allow(self):
+        """Check whether the network may be fetched now"""
+        with self.lock:
+            if self.state == 'open':
+                if time.time() < self.open_until:
+                    self.skipped += 1
+                    return False
+                self.state = 'half_open'
+                logging.info(f"Network {self.network_id} circuit half-open, probing")
+            return True
+    
+    def record_success(self):
+        with self.lock:
+            if self.state != 'closed':
+                logging.info(f"Network {self.network_id} circuit closed after {self.failures} failures")
+            self.state = 'closed'
+            self.failures = 0
+            self.open_until = None
+            self.last_error = None
+            self.last_success = time.time()
+    
+    def record_failure(self, error, settings):
+        with self.lock:
+            self.failures += 1
+            self.last_error = str(error)
+            self.last_failure = time.time()
+            if self.state == 'half_open' or self.failures >= settings['failure_threshold']:
+                doublings = min(16, max(0, self.failures - settings['failure_threshold']))
+                cooldown = min(settings['max_cooldown_seconds'], settings['cooldown_seconds'] * 2 ** doublings)
+                cooldown *= random.uniform(0.8, 1.2)
+                self.state = 'open'
+                self.open_until = self.last_failure + cooldown
+                logging.warning(f"Network {self.network_id} circuit open for {cooldown:.0f}s "
+                                f"after {self.failures} failures: {self.last_error}")
+    
+    def status(self):
+        """Get breaker state for /api/network-stats"""
+        tz = config_provider.timezone()
+        def iso(ts):
+            return datetime.fromtimestamp(ts, tz).isoformat() if ts else None
+        with self.lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self.failures,
+                'retry_at': iso(self.open_until) if self.state == 'open' else None,
+                'last_error': self.last_error,
+                'last_failure': iso(self.last_failure),
+                'last_success': iso(self.last_success),
+                'skipped_refreshes': self.skipped
+            }
+
 class EeroAPI:
     def __init__(self):
         self.session = requests.Session()
+        # Size the connection pool for concurrent fetches so workers don't
+        # discard and reopen TLS connections on every refresh
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=MAX_FETCH_CONCURRENCY)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         self.config = load_config()
         self.api_url = self.config.get('api_url', 'api-user.e2ro.com')
-        self.api_base = "https://" + self.api_url + "/2.2"
+        self.api_base = eero_api_root(self.api_url) + "/2.2"
         self.network_tokens = {}
+        self.breakers = {}  # network_id -> CircuitBreaker
+        self.breakers_lock = threading.Lock()
+        self.health_revision = 0  # bumped whenever a fetch outcome is recorded
         self.load_all_tokens()
     
     def load_all_tokens(self):
@@ -260,13 +2113,60 @@ class EeroAPI:
             headers['X-User-Token'] = token
         return headers
     
-    def get_all_devices(self, network_id):
-        """Get all devices for specific network"""
+    def breaker(self, network_id):
+        """Get the circuit breaker of a network"""
+        with self.breakers_lock:
+            breaker = self.breakers.get(network_id)
+            if breaker is None:
+                breaker = self.breakers[network_id] = CircuitBreaker(network_id)
+            return breaker
+    
+    def request_network(self, network_id, endpoint, settings=None):
+        """GET /networks/<network_id>/<endpoint> and parse the JSON body
+        
+        Transient failures are retried (see retry_delay()); the last error
+        is re-raised for the caller to handle.
+        """
+        settings = settings or get_upstream_settings()
+        url = self.api_base + "/networks/" + network_id + "/" + endpoint
+        retries = int(settings['retries'])
+        for attempt in range(retries + 1):
+            try:
+                return self._get_json(url, network_id, endpoint, settings['timeout_seconds'])
+            except Exception as e:
+                delay = retry_delay(e, attempt, settings) if attempt < retries else None
+                if delay is None:
+                    raise
+                logging.warning(f"Retrying {endpoint} for network {network_id} in {delay:.1f}s: {str(e)}")
+                time.sleep(delay)
+    
+    def _get_json(self, url, network_id, endpoint, timeout):
+        """One GET, with its latency and failure recorded in the upstream metrics"""
+        started = time.monotonic()
         try:
-            url = self.api_base + "/networks/" + network_id + "/devices"
-            response = self.session.get(url, headers=self.get_headers(network_id), timeout=15)
+            response = self.session.get(url, headers=self.get_headers(network_id), timeout=timeout)
             response.raise_for_status()
-            data = response.json()
+            return response.json()
+        except requests.HTTPError as e:
+            status = e.response.status_code if e.response is not None else 'unknown'
+            upstream_errors.inc(network_id, endpoint, str(status))
+            raise
+        except requests.Timeout:
+            upstream_errors.inc(network_id, endpoint, 'timeout')
+            raise
+        except requests.ConnectionError:
+            upstream_errors.inc(network_id, endpoint, 'connection')
+            raise
+        except Exception as e:
+            upstream_errors.inc(network_id, endpoint, type(e).__name__)
+            raise
+        finally:
+            upstream_seconds.observe(time.monotonic() - started, network_id, endpoint)
+    
+    def get_all_devices(self, network_id, settings=None):
+        """Get all devices for specific network (raises if the fetch failed)"""
+        try:
+            data = self.request_network(network_id, 'devices', settings)
             
             if 'data' in data:
                 devices = data['data'] if isinstance(data['data'], list) else data['data'].get('devices', [])
@@ -275,39 +2175,279 @@ class EeroAPI:
             return []
         except Exception as e:
             logging.error(f"Device fetch error for network {network_id}: {str(e)}")
-            return []
+            raise
     
-    def get_network_topology(self, network_id):
-        """Get network topology including eeros (access points)"""
+    def get_network_topology(self, network_id, settings=None):
+        """Get network topology including eeros (access points) (raises if the fetch failed)"""
         try:
-            url = self.api_base + "/networks/" + network_id + "/eeros"
-            response = self.session.get(url, headers=self.get_headers(network_id), timeout=15)
-            response.raise_for_status()
-            data = response.json()
+            data = self.request_network(network_id, 'eeros', settings)
             
             if 'data' in data:
                 eeros = data['data'] if isinstance(data['data'], list) else []
                 logging.info(f"Retrieved {len(eeros)} eeros from network {network_id}")
                 
                 # Debug: Log first eero structure to understand available fields
-                if eeros and len(eeros) > 0:
-                    logging.info(f"Sample eero data: {json.dumps(eeros[0], indent=2)}")
+                if eeros:
+                    diagnostics.record('eero', f"Sample eero data for network {network_id}", eeros[0])
                 
                 return eeros
             return []
         except Exception as e:
             logging.error(f"Eero fetch error for network {network_id}: {str(e)}")
-            return []
+            raise
+    
+    def fetch_networks(self, network_ids, max_workers=DEFAULT_FETCH_CONCURRENCY):
+        """Get devices and eeros for several networks concurrently
+        
+        The device and eero calls for every network are issued in parallel on
+        a bounded thread pool, so a refresh takes roughly one round-trip
+        instead of one per call. Networks whose circuit breaker is open are
+        not fetched at all; a failed fetch only affects its own network and
+        is recorded on its breaker.
+        
+        Returns {network_id: (devices, eeros), or None if the network failed
+        or was skipped}
+        """
+        network_ids = list(network_ids)
+        if not network_ids:
+            return {}
+        
+        settings = get_upstream_settings()
+        results = {}
+        allowed = []
+        for network_id in network_ids:
+            if self.breaker(network_id).allow():
+                allowed.append(network_id)
+            else:
+                logging.warning(f"Network {network_id} circuit open, serving its last data")
+                results[network_id] = None
+        
+        workers = max(1, min(max_workers, len(allowed) * 2))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='eero-fetch') as pool:
+            futures = {
+                network_id: (pool.submit(self.get_all_devices, network_id, settings),
+                             pool.submit(self.get_network_topology, network_id, settings))
+                for network_id in allowed
+            }
+            for network_id, (devices_future, eeros_future) in futures.items():
+                devices, devices_error = self._future_result(devices_future)
+                eeros, eeros_error = self._future_result(eeros_future)
+                error = devices_error or eeros_error
+                if error is None:
+                    self.breaker(network_id).record_success()
+                    results[network_id] = (devices, eeros)
+                else:
+                    self.breaker(network_id).record_failure(error, settings)
+                    results[network_id] = None
+        self.health_revision += 1
+        return results
+    
+    @staticmethod
+    def _future_result(future):
+        """Unwrap a fetch future into (result, error)"""
+        try:
+            return future.result(), None
+        except Exception as e:
+            return None, e
+    
+    def health(self, network_id):
+        """Get a network's breaker state, or None if it was never fetched"""
+        with self.breakers_lock:
+            breaker = self.breakers.get(network_id)
+        return breaker.status() if breaker is not None else None
 
 # Initialize API
 eero_api = EeroAPI()
 
+def build_ap_data(network_eeros):
+    """Build per-AP data and the BSSID -> AP map from a network's eeros"""
+    ap_data = {}
+    bssid_to_ap = {}  # Map BSSIDs to AP IDs for device assignment
+    
+    for eero in network_eeros:
+        model = eero.get('model', 'Unknown')
+        
+        # Skip gateway devices as they don't have WiFi
+        if 'gateway' in model.lower():
+            logging.debug(f"Skipping gateway device: {model}")
+            continue
+        
+        # Use nickname if available, otherwise create a descriptive name
+        nickname = eero.get('nickname', '').strip()
+        if nickname:
+            ap_name = nickname
+        else:
+            # Create a more descriptive name using location or model + serial
+            location_data = eero.get('location', '')
+            if isinstance(location_data, dict):
+                location = location_data.get('name', '')
+            else:
+                location = str(location_data) if location_data else ''
+            
+            serial = eero.get('serial', '')
+            
+            if location:
+                ap_name = f"{model} ({location})"
+            elif serial:
+                # Use last 4 characters of serial for identification
+                ap_name = f"{model} (...{serial[-4:]})"
+            else:
+                ap_name = model
+        
+        ap_id = eero.get('url', ap_name)  # Use URL as unique identifier
+        
+        # Extract numeric ID from URL for Eero Insight links
+        # URL format is typically "/2.2/eeros/38576632" - we want just "38576632"
+        numeric_id = ap_id
+        if isinstance(ap_id, str) and '/eeros/' in ap_id:
+            numeric_id = ap_id.split('/eeros/')[-1]
+        
+        # Initialize AP data
+        ap_data[ap_id] = {
+            'name': ap_name,
+            'model': model,
+            'serial': eero.get('serial', ''),
+            'location': location if 'location' in locals() else '',
+            'numeric_id': numeric_id,  # Add numeric ID for links
+            'devices_by_freq': {'2.4GHz': 0, '5GHz': 0, '6GHz': 0},
+            'total_devices': 0
+        }
+        
+        # Debug: Log AP data structure
+        diagnostics.record('eero', f"AP {ap_id}: {ap_name}", eero)
+        
+        # Map BSSIDs to this AP for device assignment
+        bssids_with_bands = eero.get('bssids_with_bands', [])
+        for bssid_info in bssids_with_bands:
+            bssid = bssid_info.get('ethernet_address', '').lower()
+            if bssid:
+                bssid_to_ap[bssid] = ap_id
+    
+    return ap_data, bssid_to_ap
+
+@lru_cache(maxsize=1024)
+def rate_signal(dbm):
+    """Get (percent, quality) for a dBm reading
+    
+    Matches convert_signal_dbm_to_percent() and get_signal_quality();
+    readings repeat across devices, so results are cached.
+    """
+    if dbm >= -50:
+        return 100, 'Excellent'
+    if dbm <= -100:
+        return 0, 'Poor'
+    percent = int(2 * (dbm + 100))
+    if dbm >= -60:
+        quality = 'Very Good'
+    elif dbm >= -70:
+        quality = 'Good'
+    elif dbm >= -80:
+        quality = 'Fair'
+    else:
+        quality = 'Poor'
+    return percent, quality
+
+def process_network_devices(network, connected_devices, ap_data, ap_index):
+    """Process a network's connected devices in a single pass
+    
+    Each device's OS, frequency, signal and AP are worked out once into a
+    device row, and all per-network aggregates are collected along the
+    way. AP device counts are added to ap_data in place.
+    """
+    network_id = intern_value(network.get('id'))
+    network_name = intern_value(network.get('name', f'Network {network_id}'))
+    devices = []
+    os_counts = {'iOS': 0, 'Android': 0, 'Windows': 0, 'Amazon': 0, 'Gaming': 0, 'Streaming': 0, 'Other': 0}
+    freq_counts = {'2.4GHz': 0, '5GHz': 0, '6GHz': 0}
+    signal_values = []
+    wireless_count = 0
+    assigned = 0
+    unassigned = 0
+    
+    for device in connected_devices:
+        # OS Detection
+        device_os = detect_device_os(device)
+        os_counts[device_os] = os_counts.get(device_os, 0) + 1
+        
+        # Connection type and frequency
+        is_wireless = device.get('wireless', False)
+        connected_ap = None
+        
+        if is_wireless:
+            wireless_count += 1
+            interface_info = device.get('interface', {})
+            freq_display, freq_band = parse_frequency(interface_info)
+            if freq_band in freq_counts:
+                freq_counts[freq_band] += 1
+            frequency = interface_info.get('frequency') if freq_display != 'N/A' else None
+            
+            # Signal Strength, parsed into the device row below
+            signal_dbm = interface_info.get('signal_dbm', 'N/A')
+            
+            # Find the connected AP through the network's lookup indexes
+            device_name = device.get('nickname') or device.get('hostname') or 'Unknown'
+            if diagnostics.wants('device'):
+                diagnostics.record('device', f"Device {device_name} structure", device)
+            connected_ap, method = ap_index.match(device, interface_info)
+            
+            if connected_ap and freq_band in ap_data[connected_ap]['devices_by_freq']:
+                ap_data[connected_ap]['devices_by_freq'][freq_band] += 1
+                ap_data[connected_ap]['total_devices'] += 1
+                assigned += 1
+            else:
+                connected_ap = None
+                unassigned += 1
+                # Log source and interface info for unassigned devices to help debug
+                if diagnostics.wants('unassigned'):
+                    diagnostics.record('unassigned', f"Could not assign {device_name}", {
+                        'source': device.get('source', {}),
+                        'interface': interface_info,
+                        'available_aps': list(ap_data.keys())
+                    })
+        else:
+            frequency = None
+            freq_band = 'Wired'
+            signal_dbm = 'N/A'
+        
+        row = device_row(
+            device.get('nickname') or device.get('hostname') or 'Unknown Device',
+            compact_ips(device.get('ips')),
+            device.get('mac', 'N/A'),
+            device.get('manufacturer', 'Unknown'),
+            device_os,
+            bool(is_wireless),
+            frequency,
+            freq_band,
+            signal_dbm,
+            network_id,
+            network_name,
+            connected_ap,
+            ap_data[connected_ap]['name'] if connected_ap else None
+        )
+        devices.append(row)
+        signal_value = row[DEVICE_SIGNAL_VALUE]
+        if signal_value is not None and -100 <= signal_value <= -10:
+            signal_values.append(signal_value)
+    
+    return {
+        'devices': DeviceTable(devices),
+        'os_counts': os_counts,
+        'freq_counts': freq_counts,
+        'signal_values': signal_values,
+        'wireless_devices': wireless_count,
+        'assigned': assigned,
+        'unassigned': unassigned
+    }
+
 def update_cache():
-    """Update data cache with real API data from authenticated networks"""
-    global data_cache
+    """Build and publish a new cache snapshot with real API data from authenticated networks"""
+    previous = get_snapshot()
+    refresh_started = time.monotonic()
     try:
         logging.info("Starting cache update with real API data...")
-        config = load_config()
+        config = get_config()
+        diagnostics.configure(config.get('diagnostics'))
+        device_os_classifier.configure(config.get('device_os'))
         networks = config.get('networks', [])
         active_networks = [n for n in networks if n.get('active', True)]
         
@@ -320,259 +2460,90 @@ def update_cache():
         combined_os_counts = {'iOS': 0, 'Android': 0, 'Windows': 0, 'Amazon': 0, 'Gaming': 0, 'Streaming': 0, 'Other': 0}
         combined_freq_counts = {'2.4GHz': 0, '5GHz': 0, '6GHz': 0}
         combined_signal_values = []
+        combined_wireless = 0
+        stale_networks = []
+        refreshed_count = 0
         current_time = get_timezone_aware_now()
         
-        # Process each active network
+        # Networks that aren't refreshed this cycle keep their previous data
+        new_networks = dict(previous.networks)
+        
+        # Only authenticated networks can be fetched
+        fetch_networks = []
         for network in active_networks:
             network_id = network.get('id')
             if not network_id:
                 continue
-                
-            logging.info(f"Processing network {network_id} ({network.get('name', 'Unknown')})")
-            
-            # Check if network is authenticated
             if network_id not in eero_api.network_tokens:
                 logging.warning(f"Network {network_id} not authenticated, skipping")
                 continue
+            fetch_networks.append(network)
+        
+        # Fetch devices and topology (access points) for all networks in parallel
+        fetch_started = time.monotonic()
+        fetched = eero_api.fetch_networks([n['id'] for n in fetch_networks], get_fetch_concurrency())
+        fetch_seconds = time.monotonic() - fetch_started
+        refresh_stage_seconds.observe(fetch_seconds, 'fetch')
+        logging.info(f"Fetched {len(fetched)} networks in {fetch_seconds:.2f}s")
+        
+        # Process each active network
+        process_started = time.monotonic()
+        for network in fetch_networks:
+            network_id = network.get('id')
+            logging.info(f"Processing network {network_id} ({network.get('name', 'Unknown')})")
             
-            # Get devices for this network using real API
-            network_devices = eero_api.get_all_devices(network_id)
-            
-            # Get network topology (access points)
-            network_eeros = eero_api.get_network_topology(network_id)
+            previous_network = previous.networks.get(network_id, {})
             
-            if not network_devices:
-                logging.warning(f"No devices returned for network {network_id}")
+            if fetched.get(network_id) is None:
+                # Failed or skipped by its circuit breaker: keep serving the
+                # network's last good data, marked stale
+                if previous_network.get('devices') is not None:
+                    new_networks[network_id] = dict(previous_network, stale=True)
+                    stale_networks.append(network_id)
+                    for device_os, count in previous_network.get('device_os', {}).items():
+                        combined_os_counts[device_os] = combined_os_counts.get(device_os, 0) + count
+                    for freq_band, count in previous_network.get('frequency_distribution', {}).items():
+                        combined_freq_counts[freq_band] = combined_freq_counts.get(freq_band, 0) + count
+                    for device in previous_network['devices']:
+                        signal_value = device[DEVICE_SIGNAL_VALUE]
+                        if signal_value is not None and -100 <= signal_value <= -10:
+                            combined_signal_values.append(signal_value)
+                    combined_devices.extend(previous_network['devices'])
+                    combined_wireless += previous_network.get('wireless_devices', 0)
+                    logging.warning(f"Network {network_id}: serving stale data from {previous_network.get('last_successful_update')}")
                 continue
             
-            # Filter connected devices
-            connected_devices = [d for d in network_devices if d.get('connected')]
-            wireless_devices = [d for d in connected_devices if d.get('wireless')]
-            
-            logging.info(f"Network {network_id}: {len(connected_devices)} connected devices ({len(wireless_devices)} wireless)")
-            
-            # Initialize network cache if not exists
-            if network_id not in data_cache['networks']:
-                data_cache['networks'][network_id] = {
-                    'connected_users': [],
-                    'signal_strength_avg': [],
-                    'devices': [],
-                    'last_update': None,
-                    'last_successful_update': None
-                }
-            
-            network_cache = data_cache['networks'][network_id]
-            
-            # Process devices for this network
-            network_device_list = []
-            network_os_counts = {'iOS': 0, 'Android': 0, 'Windows': 0, 'Amazon': 0, 'Gaming': 0, 'Streaming': 0, 'Other': 0}
-            network_freq_counts = {'2.4GHz': 0, '5GHz': 0, '6GHz': 0}
-            network_signal_values = []
+            network_devices, network_eeros = fetched[network_id]
             
-            for device in connected_devices:
-                # OS Detection
-                device_os = detect_device_os(device)
-                network_os_counts[device_os] += 1
-                combined_os_counts[device_os] += 1
-                
-                # Connection type and frequency
-                is_wireless = device.get('wireless', False)
-                interface_info = device.get('interface', {}) if is_wireless else {}
-                
-                if is_wireless:
-                    freq_display, freq_band = parse_frequency(interface_info)
-                    if freq_band in network_freq_counts:
-                        network_freq_counts[freq_band] += 1
-                        combined_freq_counts[freq_band] += 1
-                    
-                    # Signal Strength
-                    signal_dbm = interface_info.get('signal_dbm', 'N/A')
-                    signal_percent = convert_signal_dbm_to_percent(signal_dbm)
-                    signal_quality = get_signal_quality(signal_dbm)
-                    
-                    if signal_dbm != 'N/A' and signal_dbm is not None:
-                        try:
-                            if isinstance(signal_dbm, (int, float)):
-                                signal_val = float(signal_dbm)
-                            else:
-                                signal_val = float(str(signal_dbm).replace(' dBm', '').replace('dBm', '').strip())
-                            
-                            if -100 <= signal_val <= -10:
-                                network_signal_values.append(signal_val)
-                                combined_signal_values.append(signal_val)
-                        except (ValueError, TypeError):
-                            pass
-                else:
-                    freq_display = 'Wired'
-                    freq_band = 'Wired'
-                    signal_dbm = 'N/A'
-                    signal_percent = 100
-                    signal_quality = 'Wired'
-                
-                device_info = {
-                    'name': device.get('nickname') or device.get('hostname') or 'Unknown Device',
-                    'ip': ', '.join(device.get('ips', [])) if device.get('ips') else 'N/A',
-                    'mac': device.get('mac', 'N/A'),
-                    'manufacturer': device.get('manufacturer', 'Unknown'),
-                    'device_os': device_os,
-                    'connection_type': 'Wireless' if is_wireless else 'Wired',
-                    'frequency': freq_display,
-                    'frequency_band': freq_band,
-                    'signal_avg_dbm': str(signal_dbm) + " dBm" if signal_dbm != 'N/A' else 'N/A',
-                    'signal_avg': signal_percent,
-                    'signal_quality': signal_quality,
-                    'network_id': network_id,
-                    'network_name': network.get('name', f'Network {network_id}')
-                }
-                
-                network_device_list.append(device_info)
-                combined_devices.append(device_info)
+            if not network_devices:
+                logging.warning(f"No devices returned for network {network_id}")
+                continue
             
-            # Process AP (eero) data for frequency distribution per AP
-            ap_data = {}
-            bssid_to_ap = {}  # Map BSSIDs to AP IDs for device assignment
+            # Filter connected devices
+            connected_devices = [d for d in network_devices if d.get('connected')]
             
-            for eero in network_eeros:
-                model = eero.get('model', 'Unknown')
-                
-                # Skip gateway devices as they don't have WiFi
-                if 'gateway' in model.lower():
-                    logging.info(f"Skipping gateway device: {model}")
-                    continue
-                
-                # Use nickname if available, otherwise create a descriptive name
-                nickname = eero.get('nickname', '').strip()
-                if nickname:
-                    ap_name = nickname
-                else:
-                    # Create a more descriptive name using location or model + serial
-                    location_data = eero.get('location', '')
-                    if isinstance(location_data, dict):
-                        location = location_data.get('name', '')
-                    else:
-                        location = str(location_data) if location_data else ''
-                    
-                    serial = eero.get('serial', '')
-                    
-                    if location:
-                        ap_name = f"{model} ({location})"
-                    elif serial:
-                        # Use last 4 characters of serial for identification
-                        ap_name = f"{model} (...{serial[-4:]})"
-                    else:
-                        ap_name = model
-                
-                ap_id = eero.get('url', ap_name)  # Use URL as unique identifier
-                
-                # Extract numeric ID from URL for Eero Insight links
-                # URL format is typically "/2.2/eeros/38576632" - we want just "38576632"
-                numeric_id = ap_id
-                if isinstance(ap_id, str) and '/eeros/' in ap_id:
-                    numeric_id = ap_id.split('/eeros/')[-1]
-                
-                # Initialize AP data
-                ap_data[ap_id] = {
-                    'name': ap_name,
-                    'model': model,
-                    'serial': eero.get('serial', ''),
-                    'location': location if 'location' in locals() else '',
-                    'numeric_id': numeric_id,  # Add numeric ID for links
-                    'devices_by_freq': {'2.4GHz': 0, '5GHz': 0, '6GHz': 0},
-                    'total_devices': 0
-                }
-                
-                # Debug: Log AP data structure
-                logging.info(f"AP {ap_id}: {ap_name} - Full eero data: {json.dumps(eero, indent=2)}")
-                
-                # Map BSSIDs to this AP for device assignment
-                bssids_with_bands = eero.get('bssids_with_bands', [])
-                for bssid_info in bssids_with_bands:
-                    bssid = bssid_info.get('ethernet_address', '').lower()
-                    if bssid:
-                        bssid_to_ap[bssid] = ap_id
-            
-            # Assign devices to APs based on BSSID matching
-            assigned_devices = 0
-            unassigned_devices = 0
-            
-            for device in connected_devices:
-                if not device.get('wireless'):
-                    continue  # Skip wired devices for AP analysis
-                
-                interface_info = device.get('interface', {})
-                freq_display, freq_band = parse_frequency(interface_info)
-                device_name = device.get('nickname') or device.get('hostname') or 'Unknown'
-                
-                # Log device structure to understand available fields including 'source'
-                logging.info(f"Device {device_name} structure: {json.dumps(device, indent=2)}")
-                
-                # Try multiple methods to find the connected AP
-                connected_ap = None
-                
-                # Method 0: Check for 'source' field in device object (NEW - as per user instruction)
-                device_source = device.get('source', {})
-                if device_source and isinstance(device_source, dict):
-                    # The source field contains AP information with location
-                    source_location = device_source.get('location', '')
-                    source_url = device_source.get('url', '')
-                    
-                    if source_location or source_url:
-                        # Try to match by location name or URL
-                        for ap_id, ap_info in ap_data.items():
-                            # Match by location
-                            if source_location and source_location.lower() in ap_info['name'].lower():
-                                connected_ap = ap_id
-                                logging.info(f"Method 0 (NEW): Assigned {device_name} to AP {ap_info['name']} via source location: {source_location}")
-                                break
-                            # Match by URL
-                            elif source_url and source_url == ap_id:
-                                connected_ap = ap_id
-                                logging.info(f"Method 0 (NEW): Assigned {device_name} to AP {ap_info['name']} via source URL: {source_url}")
-                                break
-                
-                # Method 1: Direct eero_url (if available)
-                if not connected_ap:
-                    eero_url = interface_info.get('eero_url') or interface_info.get('eero')
-                    if eero_url and eero_url in ap_data:
-                        connected_ap = eero_url
-                        logging.debug(f"Method 1: Assigned {device_name} to AP via eero_url")
-                
-                # Method 2: BSSID matching (most reliable)
-                if not connected_ap:
-                    bssid = interface_info.get('bssid', '').lower()
-                    if bssid and bssid in bssid_to_ap:
-                        connected_ap = bssid_to_ap[bssid]
-                        logging.debug(f"Method 2: Assigned {device_name} to AP via BSSID {bssid}")
-                
-                # Method 3: Try other interface fields
-                if not connected_ap:
-                    # Check for other possible connection identifiers
-                    for field in ['ap_mac', 'access_point', 'connected_eero', 'parent_eero']:
-                        if field in interface_info:
-                            field_value = str(interface_info[field]).lower()
-                            if field_value in bssid_to_ap:
-                                connected_ap = bssid_to_ap[field_value]
-                                logging.debug(f"Method 3: Assigned {device_name} to AP via {field}")
-                                break
-                
-                # Assign device to AP if we found a match
-                if connected_ap and freq_band in ap_data[connected_ap]['devices_by_freq']:
-                    ap_data[connected_ap]['devices_by_freq'][freq_band] += 1
-                    ap_data[connected_ap]['total_devices'] += 1
-                    assigned_devices += 1
-                    logging.info(f"✅ Successfully assigned {device_name} to AP {ap_data[connected_ap]['name']} ({freq_band})")
-                else:
-                    unassigned_devices += 1
-                    # Log full device and interface info for unassigned devices to help debug
-                    logging.info(f"❌ Could not assign {device_name}")
-                    source_info = device.get('source', {})
-                    if isinstance(source_info, dict):
-                        logging.info(f"   Device source location: {source_info.get('location', 'NOT FOUND')}")
-                        logging.info(f"   Device source URL: {source_info.get('url', 'NOT FOUND')}")
-                    else:
-                        logging.info(f"   Device source field: {source_info}")
-                    logging.info(f"   Interface: {json.dumps(interface_info, indent=2)}")
-                    logging.info(f"   Available APs: {list(ap_data.keys())}")
+            # Process AP (eero) data, then every device in a single pass
+            ap_data, bssid_to_ap = build_ap_data(network_eeros)
+            ap_index = get_ap_index(network_id, ap_data, bssid_to_ap)
+            processed = process_network_devices(network, connected_devices, ap_data, ap_index)
+            
+            network_device_list = processed['devices']
+            network_os_counts = processed['os_counts']
+            network_freq_counts = processed['freq_counts']
+            network_signal_values = processed['signal_values']
+            unassigned_devices = processed['unassigned']
+            
+            for device_os, count in network_os_counts.items():
+                combined_os_counts[device_os] = combined_os_counts.get(device_os, 0) + count
+            for freq_band, count in network_freq_counts.items():
+                combined_freq_counts[freq_band] += count
+            combined_signal_values.extend(network_signal_values)
+            combined_devices.extend(network_device_list)
+            combined_wireless += processed['wireless_devices']
+            devices_processed.inc(network_id, amount=len(connected_devices))
+            
+            logging.info(f"Network {network_id}: {len(connected_devices)} connected devices ({processed['wireless_devices']} wireless)")
+            logging.info(f"Network {network_id}: {processed['assigned']} devices assigned to APs, {unassigned_devices} unassigned")
             
             # THEORETICAL CAPACITY DISTRIBUTION
             # Shows how devices would theoretically be distributed based on AP capabilities
@@ -616,18 +2587,9 @@ def update_cache():
                     ap_capacity_weights[ap_id] = capacity_weight
                     total_capacity_weight += capacity_weight
                 
-                # Distribute devices based on theoretical capacity
-                device_counts_by_freq = {'2.4GHz': 0, '5GHz': 0, '6GHz': 0}
-                
-                # Count actual devices by frequency
-                for device in connected_devices:
-                    if not device.get('wireless'):
-                        continue
-                    
-                    interface_info = device.get('interface', {})
-                    freq_display, freq_band = parse_frequency(interface_info)
-                    if freq_band in device_counts_by_freq:
-                        device_counts_by_freq[freq_band] += 1
+                # Distribute devices based on theoretical capacity, using the
+                # actual wireless device counts by frequency
+                device_counts_by_freq = dict(network_freq_counts)
                 
                 # Distribute each frequency band based on theoretical capacity
                 for freq_band, total_devices_in_band in device_counts_by_freq.items():
@@ -652,117 +2614,757 @@ def update_cache():
             
             logging.info(f"Network {network_id}: Theoretical capacity distribution calculated for {len(connected_devices)} total devices")
             
-            # Update network-specific history
-            network_connected_users = network_cache.get('connected_users', [])
-            network_connected_users.append({
-                'timestamp': current_time.isoformat(),
-                'count': len(connected_devices)
-            })
-            if len(network_connected_users) > 168:
-                network_connected_users = network_connected_users[-168:]
+            # Update network-specific history in fixed wall-clock buckets
+            sample_ts = current_time.timestamp()
+            network_connected_users = history_sampler.observe(
+                (network_id, 'connected_users'), sample_ts, len(connected_devices),
+                previous_network.get('connected_users', []))
             
-            network_signal_strength_avg = network_cache.get('signal_strength_avg', [])
+            network_signal_strength_avg = previous_network.get('signal_strength_avg', [])
+            network_avg_signal = None
             if network_signal_values:
-                avg_signal = sum(network_signal_values) / len(network_signal_values)
-                logging.info(f"Network {network_id}: {len(network_signal_values)} wireless devices, avg signal: {avg_signal:.1f} dBm")
-                network_signal_strength_avg.append({
-                    'timestamp': current_time.isoformat(),
-                    'avg_dbm': round(avg_signal, 1)
-                })
-            if len(network_signal_strength_avg) > 168:
-                network_signal_strength_avg = network_signal_strength_avg[-168:]
-            
-            # Update network cache
-            network_cache.update({
+                network_avg_signal = round(sum(network_signal_values) / len(network_signal_values), 1)
+                logging.info(f"Network {network_id}: {len(network_signal_values)} wireless devices, avg signal: {network_avg_signal:.1f} dBm")
+                network_signal_strength_avg = history_sampler.observe(
+                    (network_id, 'signal_strength_avg'), sample_ts, network_avg_signal,
+                    network_signal_strength_avg)
+            
+            # Build network cache
+            new_networks[network_id] = {
                 'connected_users': network_connected_users,
                 'signal_strength_avg': network_signal_strength_avg,
+                'avg_signal_dbm': network_avg_signal,
                 'devices': network_device_list,
                 'device_os': network_os_counts,
                 'frequency_distribution': network_freq_counts,
                 'ap_data': ap_data,  # Add AP data
                 'total_devices': len(connected_devices),
-                'wireless_devices': len(wireless_devices),
-                'wired_devices': len(connected_devices) - len(wireless_devices),
+                'wireless_devices': processed['wireless_devices'],
+                'wired_devices': len(connected_devices) - processed['wireless_devices'],
                 'last_update': current_time.isoformat(),
-                'last_successful_update': current_time.isoformat()
-            })
-        
-        # Update combined cache
-        combined_connected_users = data_cache['combined'].get('connected_users', [])
+                'last_successful_update': current_time.isoformat(),
+                'stale': False
+            }
+            refreshed_count += 1
+        
+        # Build combined cache
+        refresh_stage_seconds.observe(time.monotonic() - process_started, 'process')
+        # With no network refreshed, the combined data is only carried over
+        # (or empty, on a cold start): it is stale and adds nothing to the history
+        all_stale = not refreshed_count
+        sample_ts = current_time.timestamp()
         total_combined_devices = len(combined_devices)
-        combined_connected_users.append({
-            'timestamp': current_time.isoformat(),
-            'count': total_combined_devices
-        })
-        if len(combined_connected_users) > 168:
-            combined_connected_users = combined_connected_users[-168:]
-        
-        combined_signal_strength_avg = data_cache['combined'].get('signal_strength_avg', [])
+        combined_connected_users = previous.combined.get('connected_users', [])
+        if not all_stale:
+            combined_connected_users = history_sampler.observe(
+                (COMBINED_SERIES_ID, 'connected_users'), sample_ts, total_combined_devices,
+                combined_connected_users)
+        
+        combined_signal_strength_avg = previous.combined.get('signal_strength_avg', [])
+        combined_avg_signal = None
         if combined_signal_values:
-            avg_signal = sum(combined_signal_values) / len(combined_signal_values)
-            logging.info(f"Combined: {len(combined_signal_values)} total wireless devices, avg signal: {avg_signal:.1f} dBm")
-            combined_signal_strength_avg.append({
-                'timestamp': current_time.isoformat(),
-                'avg_dbm': round(avg_signal, 1)
-            })
-        if len(combined_signal_strength_avg) > 168:
-            combined_signal_strength_avg = combined_signal_strength_avg[-168:]
+            combined_avg_signal = round(sum(combined_signal_values) / len(combined_signal_values), 1)
+            logging.info(f"Combined: {len(combined_signal_values)} total wireless devices, avg signal: {combined_avg_signal:.1f} dBm")
+            if not all_stale:
+                combined_signal_strength_avg = history_sampler.observe(
+                    (COMBINED_SERIES_ID, 'signal_strength_avg'), sample_ts, combined_avg_signal,
+                    combined_signal_strength_avg)
         
-        # Calculate combined wireless/wired counts
-        combined_wireless = len([d for d in combined_devices if d['connection_type'] == 'Wireless'])
         combined_wired = len(combined_devices) - combined_wireless
         
-        data_cache['combined'].update({
+        new_combined = {
             'connected_users': combined_connected_users,
             'device_os': combined_os_counts,
             'frequency_distribution': combined_freq_counts,
             'signal_strength_avg': combined_signal_strength_avg,
-            'devices': combined_devices,
+            'avg_signal_dbm': combined_avg_signal,
+            'devices': DeviceTable(combined_devices),
             'total_devices': total_combined_devices,
             'wireless_devices': combined_wireless,
             'wired_devices': combined_wired,
             'last_update': current_time.isoformat(),
-            'last_successful_update': current_time.isoformat(),
-            'active_networks': len(active_networks)
-        })
+            'last_successful_update': (previous.combined.get('last_successful_update') if all_stale
+                                       else current_time.isoformat()),
+            'active_networks': len(active_networks),
+            'stale_networks': stale_networks,
+            'stale': all_stale
+        }
         
-        logging.info(f"Cache updated with real API data: {len(active_networks)} networks, {total_combined_devices} total devices")
+        publish_started = time.monotonic()
+        snapshot = publish_snapshot(new_networks, new_combined)
+        refresh_stage_seconds.observe(time.monotonic() - publish_started, 'publish')
+        logging.info(f"Cache snapshot v{snapshot.version} published with real API data: {len(active_networks)} networks, {total_combined_devices} total devices")
         
     except Exception as e:
         logging.error("Cache update error: " + str(e))
+        refresh_errors.inc()
         # Update last_update timestamp even on error
         current_time = get_timezone_aware_now()
-        data_cache['combined']['last_update'] = current_time.isoformat()
+        publish_snapshot(previous.networks, dict(previous.combined, last_update=current_time.isoformat()))
+    finally:
+        refresh_seconds.observe(time.monotonic() - refresh_started)
+
+# Signal analytics
+SIGNAL_PERCENTILES = (10, 50, 90)
+SIGNAL_QUALITY_EDGES = (-80, -70, -60, -50)  # same thresholds as get_signal_quality()
+SIGNAL_QUALITY_NAMES = ('Poor', 'Fair', 'Good', 'Very Good', 'Excellent')
+
+class SignalAnalytics:
+    """Signal distribution summaries per network, band and AP
+    
+    Readings are gathered from the snapshot once. With NumPy each grouping
+    is then summarized in a few array operations regardless of the number of
+    devices or groups: sort by (group, signal), read percentiles from the
+    sorted runs, reduceat() for sums and bincount() for quality buckets.
+    Without NumPy the same numbers are computed in plain Python.
+    """
+    
+    def __init__(self, use_numpy=None):
+        self.use_numpy = np is not None if use_numpy is None else use_numpy
+    
+    @staticmethod
+    def readings(snapshot):
+        """Get (dBm, network_id, network_name, band, ap_id, ap_name) for every valid reading"""
+        readings = []
+        for device in snapshot.combined.get('devices', []):
+            value = device[DEVICE_SIGNAL_VALUE]
+            if value is not None and -100 <= value <= -10:
+                readings.append((value, device[DEVICE_NETWORK_ID], device[DEVICE_NETWORK_NAME],
+                                 device[DEVICE_BAND], device[DEVICE_AP_ID], device[DEVICE_AP_NAME]))
+        return readings
+    
+    @staticmethod
+    def bulk_percent(values):
+        """convert_signal_dbm_to_percent() over an array of dBm readings"""
+        return np.where(values >= -50, 100, np.where(values <= -100, 0, np.trunc(2 * (values + 100)))).astype(np.int64)
+    
+    @staticmethod
+    def bulk_quality(values):
+        """get_signal_quality() over an array of dBm readings, as SIGNAL_QUALITY_NAMES indexes"""
+        return np.digitize(values, SIGNAL_QUALITY_EDGES)
+    
+    def _numpy_groups(self, values, codes, group_count):
+        order = np.lexsort((values, codes))
+        values = values[order]
+        codes = codes[order]
+        counts = np.bincount(codes, minlength=group_count)
+        present = np.flatnonzero(counts)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[present]
+        counts = counts[present]
+        
+        # Linear interpolation between closest ranks, as numpy.percentile does
+        percentiles = {}
+        for q in SIGNAL_PERCENTILES:
+            position = starts + (counts - 1) * (q / 100)
+            low = np.floor(position).astype(np.int64)
+            high = np.minimum(low + 1, starts + counts - 1)
+            percentiles[q] = values[low] + (values[high] - values[low]) * (position - low)
+        
+        sums = np.add.reduceat(values, starts)
+        percent_sums = np.add.reduceat(self.bulk_percent(values), starts)
+        buckets = np.bincount(codes * len(SIGNAL_QUALITY_NAMES) + self.bulk_quality(values),
+                              minlength=group_count * len(SIGNAL_QUALITY_NAMES))
+        buckets = buckets.reshape(group_count, len(SIGNAL_QUALITY_NAMES))[present]
+        
+        results = {}
+        for i, code in enumerate(present.tolist()):
+            count = int(counts[i])
+            results[code] = self._stats(
+                count, float(sums[i]), float(values[starts[i]]), float(values[starts[i] + count - 1]),
+                {q: float(percentiles[q][i]) for q in SIGNAL_PERCENTILES},
+                float(percent_sums[i]), buckets[i].tolist())
+        return results
+    
+    @staticmethod
+    def _percentile(ordered, q):
+        position = (len(ordered) - 1) * (q / 100)
+        low = int(position)
+        high = min(low + 1, len(ordered) - 1)
+        return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+    
+    def _python_groups(self, values, codes, group_count):
+        grouped = {}
+        for value, code in zip(values, codes):
+            grouped.setdefault(code, []).append(value)
+        results = {}
+        for code, group in grouped.items():
+            group.sort()
+            buckets = [0] * len(SIGNAL_QUALITY_NAMES)
+            percent_sum = 0
+            for value in group:
+                buckets[sum(1 for edge in SIGNAL_QUALITY_EDGES if value >= edge)] += 1
+                percent_sum += convert_signal_dbm_to_percent(value)
+            results[code] = self._stats(
+                len(group), sum(group), group[0], group[-1],
+                {q: self._percentile(group, q) for q in SIGNAL_PERCENTILES},
+                percent_sum, buckets)
+        return results
+    
+    @staticmethod
+    def _stats(count, total, low, high, percentiles, percent_sum, buckets):
+        stats = {
+            'count': count,
+            'avg_dbm': round(total / count, 1),
+            'min_dbm': low,
+            'max_dbm': high
+        }
+        for q in SIGNAL_PERCENTILES:
+            stats[f'p{q}_dbm'] = round(percentiles[q], 1)
+        stats['avg_percent'] = round(percent_sum / count, 1)
+        stats['quality'] = dict(zip(SIGNAL_QUALITY_NAMES, buckets))
+        return stats
+    
+    def _group(self, values, keys):
+        """Summarize values grouped by keys: {key: stats}"""
+        labels = {}
+        codes = [labels.setdefault(key, len(labels)) for key in keys]
+        if not codes:
+            return {}
+        if self.use_numpy:
+            results = self._numpy_groups(np.asarray(values, dtype=np.float64),
+                                         np.asarray(codes, dtype=np.int64), len(labels))
+        else:
+            results = self._python_groups(values, codes, len(labels))
+        return {key: results[code] for key, code in labels.items()}
+    
+    def summarize(self, snapshot):
+        """Get the /api/signal/summary response for a snapshot"""
+        readings = self.readings(snapshot)
+        values = [reading[0] for reading in readings]
+        
+        networks = self._group(values, [reading[1] for reading in readings])
+        network_names = {reading[1]: reading[2] for reading in readings}
+        for network_id, stats in networks.items():
+            stats['name'] = network_names[network_id]
+        
+        assigned = [reading for reading in readings if reading[4]]
+        aps = self._group([reading[0] for reading in assigned], [reading[4] for reading in assigned])
+        ap_details = {reading[4]: (reading[5], reading[1]) for reading in assigned}
+        for ap_id, stats in aps.items():
+            stats['name'], stats['network_id'] = ap_details[ap_id]
+        
+        return {
+            'version': snapshot.version,
+            'last_update': snapshot.combined.get('last_update'),
+            'engine': 'numpy' if self.use_numpy else 'python',
+            'overall': self._group(values, [None] * len(values)).get(None),
+            'networks': networks,
+            'bands': self._group(values, [reading[3] for reading in readings]),
+            'aps': aps
+        }
+
+signal_analytics = SignalAnalytics()
+
+# Profiling
+PROFILE_DIR = LOCAL_DIR / "profiles"
+PROFILE_MODES = ('cprofile', 'sampling', 'both')
+PROFILE_TARGETS = ('refresh', 'request')
+DEFAULT_PROFILING_SETTINGS = {
+    'auto_threshold_seconds': 20,   # a refresh slower than this arms a capture; 0 disables
+    'auto_cycles': 1,               # refreshes captured after a slow one
+    'auto_cooldown_seconds': 3600,  # at most one automatic capture per cooldown
+    'sample_interval_ms': 5,        # stack sampling period
+    'max_captures': 20              # oldest captures are deleted beyond this
+}
+MAX_PROFILE_COUNT = 100  # captures armed by one admin request
+
+class StackSampler:
+    """Samples one thread's Python stack on a timer into collapsed stacks
+    
+    The output is the "frame;frame;frame count" format read by flamegraph.pl,
+    speedscope and similar tools, outermost frame first.
+    """
+    
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = {}
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+    
+    def start(self):
+        self.thread.start()
+        return self
+    
+    def stop(self):
+        self.stop_event.set()
+        self.thread.join()
+    
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                key = ';'.join(reversed(stack))
+                self.counts[key] = self.counts.get(key, 0) + 1
+    
+    def collapsed(self):
+        return ''.join(f"{stack} {count}\n" for stack, count in sorted(self.counts.items()))
+
+class Profiler:
+    """On-demand cProfile and stack-sampling captures of refreshes and requests
+    
+    An admin arms a capture of the next N refresh cycles or requests; a
+    refresh slower than the configured threshold arms one automatically.
+    While nothing is armed, a refresh or request pays one attribute check.
+    Only one capture runs at a time, since the profilers are process-wide.
+    Each capture is saved under PROFILE_DIR as <id>.pstats and/or
+    <id>.collapsed, plus <id>.json describing it.
+    """
+    
+    def __init__(self, directory):
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.busy = threading.Lock()
+        self.armed = {target: 0 for target in PROFILE_TARGETS}
+        self.modes = {target: 'both' for target in PROFILE_TARGETS}
+        self.triggers = {target: 'manual' for target in PROFILE_TARGETS}
+        self.route = None           # only profile requests to this route, if set
+        self.last_auto = None
+        self.captured = 0
+    
+    def settings(self):
+        """Get the 'profiling' config section merged over the defaults"""
+        settings = dict(DEFAULT_PROFILING_SETTINGS)
+        try:
+            for key, value in get_config().get('profiling', {}).items():
+                if key in settings:
+                    settings[key] = max(0.0, float(value))
+        except Exception as e:
+            logging.warning("Invalid profiling settings, using defaults: " + str(e))
+            settings = dict(DEFAULT_PROFILING_SETTINGS)
+        return settings
+    
+    def arm(self, target, count, mode='both', route=None, trigger='manual'):
+        """Capture the next count refreshes or requests; count 0 disarms"""
+        if target not in PROFILE_TARGETS:
+            raise ValueError(f"target must be one of {', '.join(PROFILE_TARGETS)}")
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"mode must be one of {', '.join(PROFILE_MODES)}")
+        count = int(count)
+        if not 0 <= count <= MAX_PROFILE_COUNT:
+            raise ValueError(f"count must be between 0 and {MAX_PROFILE_COUNT}")
+        with self.lock:
+            self.armed[target] = count
+            self.modes[target] = mode
+            self.triggers[target] = trigger
+            if target == 'request':
+                self.route = route or None
+        logging.info(f"Profiler armed for {count} {target} capture(s) ({mode}, {trigger})")
+    
+    def _claim(self, target, label):
+        """Take one armed capture for target, if any is left and none is running"""
+        if not self.armed[target]:
+            return None
+        with self.lock:
+            if not self.armed[target] or (target == 'request' and self.route and label != self.route):
+                return None
+            if not self.busy.acquire(blocking=False):
+                return None
+            self.armed[target] -= 1
+            return self.modes[target], self.triggers[target]
+    
+    def start(self, target, label):
+        """Start a capture if one is armed for target; returns a handle for finish()"""
+        claimed = self._claim(target, label)
+        if claimed is None:
+            return None
+        mode, trigger = claimed
+        profile = sampler = None
+        try:
+            if mode in ('cprofile', 'both'):
+                profile = cProfile.Profile()
+                profile.enable()
+            if mode in ('sampling', 'both'):
+                interval = max(0.001, self.settings()['sample_interval_ms'] / 1000)
+                sampler = StackSampler(threading.get_ident(), interval).start()
+        except Exception as e:
+            logging.error(f"Profiler start error: {str(e)}")
+            if profile is not None:
+                profile.disable()
+            self.busy.release()
+            return None
+        return {'target': target, 'label': label, 'mode': mode, 'trigger': trigger,
+                'profile': profile, 'sampler': sampler, 'started': time.monotonic(),
+                'created': get_timezone_aware_now()}
+    
+    def finish(self, handle):
+        """Stop a capture and save it"""
+        duration = time.monotonic() - handle['started']
+        try:
+            if handle['profile'] is not None:
+                handle['profile'].disable()
+            if handle['sampler'] is not None:
+                handle['sampler'].stop()
+            self.save(handle, duration)
+        except Exception as e:
+            logging.error(f"Profiler save error: {str(e)}")
+        finally:
+            self.busy.release()
+    
+    def save(self, handle, duration):
+        self.directory.mkdir(exist_ok=True)
+        slug = re.sub(r'[^A-Za-z0-9]+', '_', handle['label']).strip('_') or 'root'
+        capture_id = f"{handle['created'].strftime('%Y%m%d-%H%M%S-%f')}-{handle['target']}-{slug}"
+        files = []
+        if handle['profile'] is not None:
+            handle['profile'].dump_stats(str(self.directory / f"{capture_id}.pstats"))
+            files.append(f"{capture_id}.pstats")
+        if handle['sampler'] is not None:
+            (self.directory / f"{capture_id}.collapsed").write_text(handle['sampler'].collapsed())
+            files.append(f"{capture_id}.collapsed")
+        write_json_atomic(self.directory / f"{capture_id}.json", {
+            'id': capture_id,
+            'target': handle['target'],
+            'label': handle['label'],
+            'mode': handle['mode'],
+            'trigger': handle['trigger'],
+            'created': handle['created'].isoformat(),
+            'duration_seconds': round(duration, 4),
+            'files': files
+        })
+        self.captured += 1
+        logging.info(f"Profile {capture_id} saved ({duration:.2f}s)")
+        self.prune()
+    
+    def prune(self):
+        """Delete the oldest captures beyond max_captures"""
+        captures = self.list()
+        for capture in captures[int(self.settings()['max_captures']):]:
+            for name in capture.get('files', []) + [f"{capture['id']}.json"]:
+                try:
+                    (self.directory / name).unlink()
+                except OSError:
+                    pass
+    
+    def list(self):
+        """Get saved captures, newest first"""
+        captures = []
+        if not self.directory.exists():
+            return captures
+        for path in self.directory.glob('*.json'):
+            try:
+                with open(path) as f:
+                    captures.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return sorted(captures, key=lambda capture: capture.get('id', ''), reverse=True)
+    
+    def file_path(self, name):
+        """Get the path of a saved capture file, or None if there is no such file"""
+        if name.endswith(('.pstats', '.collapsed', '.json')) and name == os.path.basename(name):
+            path = self.directory / name
+            if path.is_file():
+                return path
+        return None
+    
+    def observe_cycle(self, seconds):
+        """Arm a capture of the next refreshes after a slow one"""
+        settings = self.settings()
+        threshold = settings['auto_threshold_seconds']
+        if not threshold or seconds < threshold or self.armed['refresh']:
+            return
+        now = time.monotonic()
+        if self.last_auto is not None and now - self.last_auto < settings['auto_cooldown_seconds']:
+            return
+        self.last_auto = now
+        logging.warning(f"Refresh took {seconds:.1f}s (threshold {threshold:g}s), profiling the next cycle(s)")
+        self.arm('refresh', max(1, int(settings['auto_cycles'])), trigger='auto')
+    
+    def wrap(self, refresh_func):
+        """Wrap a refresh function so its cycles can be captured and timed"""
+        def profiled_refresh():
+            handle = self.start('refresh', refresh_func.__name__)
+            started = time.monotonic()
+            try:
+                return refresh_func()
+            finally:
+                if handle is not None:
+                    self.finish(handle)
+                else:
+                    self.observe_cycle(time.monotonic() - started)
+        profiled_refresh.__name__ = refresh_func.__name__
+        return profiled_refresh
+    
+    def status(self):
+        with self.lock:
+            return {'armed': dict(self.armed), 'modes': dict(self.modes), 'route': self.route,
+                    'running': self.busy.locked(), 'captured': self.captured}
+
+profiler = Profiler(PROFILE_DIR)
+
+# Refresh coordination
+DEFAULT_MIN_REFRESH_INTERVAL = 5  # seconds; newer data is served as-is
+
+def get_min_refresh_interval():
+    """Get configured minimum time between two refreshes in seconds"""
+    try:
+        polling = get_config().get('polling', {})
+        return max(0.0, float(polling.get('min_refresh_interval', DEFAULT_MIN_REFRESH_INTERVAL)))
+    except Exception as e:
+        logging.warning("Invalid minimum refresh interval, using default: " + str(e))
+        return DEFAULT_MIN_REFRESH_INTERVAL
+
+class RefreshCoordinator:
+    """Single-flight wrapper around update_cache()
+    
+    The first caller runs the refresh; callers arriving while it is in
+    flight wait for it and share its outcome instead of starting their own
+    upstream fetch. Callers arriving within the minimum refresh interval of
+    the last completed refresh get the current data without a refresh.
+    """
+    
+    def __init__(self, refresh_func, min_interval_func):
+        self.refresh_func = refresh_func
+        self.min_interval_func = min_interval_func
+        self.condition = threading.Condition()
+        self.in_flight = False
+        self.generation = 0
+        self.last_completed = None
+        self.last_outcome = None
+        self.stats = {'requested': 0, 'executed': 0, 'coalesced': 0, 'throttled': 0, 'failed': 0}
+    
+    def refresh(self, force=False):
+        """Refresh the cache unless one is running or just finished
+        
+        Returns 'refreshed', 'failed', 'coalesced' or 'throttled'.
+        """
+        with self.condition:
+            self.stats['requested'] += 1
+            
+            if self.in_flight:
+                self.stats['coalesced'] += 1
+                target = self.generation + 1
+                while self.generation < target:
+                    self.condition.wait()
+                return 'coalesced'
+            
+            if (not force and self.last_completed is not None and
+                    time.monotonic() - self.last_completed < self.min_interval_func()):
+                self.stats['throttled'] += 1
+                return 'throttled'
+            
+            self.in_flight = True
+        
+        outcome = 'failed'
+        try:
+            self.refresh_func()
+            outcome = 'refreshed'
+        except Exception as e:
+            logging.error("Cache refresh error: " + str(e))
+        finally:
+            with self.condition:
+                self.stats['executed'] += 1
+                if outcome == 'failed':
+                    self.stats['failed'] += 1
+                self.in_flight = False
+                self.generation += 1
+                self.last_completed = time.monotonic()
+                self.last_outcome = outcome
+                self.condition.notify_all()
+        return outcome
+    
+    def status(self):
+        """Get refresh counters for health reporting"""
+        with self.condition:
+            return dict(self.stats, in_flight=self.in_flight, last_outcome=self.last_outcome)
+
+refresh_coordinator = RefreshCoordinator(profiler.wrap(update_cache), get_min_refresh_interval)
+
+# Background polling
+DEFAULT_POLL_INTERVAL = 60  # seconds between upstream refreshes
+MIN_POLL_INTERVAL = 10      # never hammer the eero API faster than this
+
+def get_poll_interval():
+    """Get configured polling interval in seconds"""
+    try:
+        polling = get_config().get('polling', {})
+        interval = float(polling.get('interval_seconds', DEFAULT_POLL_INTERVAL))
+        return max(MIN_POLL_INTERVAL, interval)
+    except Exception as e:
+        logging.warning("Invalid polling interval, using default: " + str(e))
+        return DEFAULT_POLL_INTERVAL
+
+class CachePoller:
+    """Refreshes the data cache on a fixed cadence in a background thread
+
+    Request handlers only read the latest published snapshot, so their
+    latency no longer depends on the eero API and upstream load stays the
+    same no matter how many kiosks are open.
+    """
+
+    def __init__(self, refresh_func, interval_func):
+        self.refresh_func = refresh_func
+        self.interval_func = interval_func
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.cycles = 0
+        self.last_started = None
+        self.last_duration = None
+
+    def start(self):
+        """Start the polling thread (no-op if already running)"""
+        if self.thread and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name='cache-poller', daemon=True)
+        self.thread.start()
+        logging.info(f"Cache poller started (interval {self.interval_func():.0f}s)")
+
+    def stop(self, timeout=5):
+        """Stop the polling thread"""
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout)
+
+    def is_running(self):
+        return bool(self.thread and self.thread.is_alive())
+
+    def status(self):
+        """Get poller status for health reporting"""
+        return {
+            'running': self.is_running(),
+            'interval_seconds': self.interval_func(),
+            'cycles': self.cycles,
+            'last_started': self.last_started,
+            'last_duration_seconds': round(self.last_duration, 3) if self.last_duration is not None else None
+        }
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            started = time.monotonic()
+            self.last_started = get_timezone_aware_now().isoformat()
+            try:
+                self.refresh_func()
+            except Exception as e:
+                logging.error("Cache poller cycle error: " + str(e))
+            self.last_duration = time.monotonic() - started
+            self.cycles += 1
+
+            # Keep a fixed cadence: subtract the time the refresh itself took
+            delay = max(0, self.interval_func() - self.last_duration)
+            self.stop_event.wait(delay)
+
+cache_poller = CachePoller(refresh_coordinator.refresh, get_poll_interval)
+
+# Dashboard page
+TEMPLATE_VERSION_MARKER = '6.9.0-mobile-swipe'
+
+class TemplateCache:
+    """index.html held in memory, precompressed, reloaded when its mtime changes
+    
+    Serving a page load costs one stat() and sends the stored bytes. The
+    ETag lets browsers and kiosks revalidate with a 304 instead of downloading
+    the page again.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.mtime = None
+        self.variants = None  # {encoding: (body, etag)}, None if unusable
+    
+    def _load(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        
+        if TEMPLATE_VERSION_MARKER in content:
+            logging.info("✅ New version found in template")
+        else:
+            logging.warning("❌ Old version still in template")
+        
+        if 'showAdmin' not in content or len(content) <= 10000:
+            logging.warning(f"Template {self.path} looks incomplete ({len(content)} characters)")
+            return None
+        
+        raw = content.encode('utf-8')
+        etag = hashlib.blake2b(raw, digest_size=16).hexdigest()
+        variants = {
+            'identity': (raw, etag),
+            'gzip': (gzip.compress(raw, 9), etag + '-gzip')
+        }
+        if brotli is not None:
+            variants['br'] = (brotli.compress(raw, quality=11), etag + '-br')
+        logging.info(f"Loaded dashboard template: {len(raw)} bytes, "
+                     f"{', '.join(f'{name} {len(body)}' for name, (body, _) in variants.items())}")
+        return variants
+    
+    def get(self):
+        """Get the current variants, reloading the file if it changed"""
+        mtime = self.path.stat().st_mtime_ns
+        with self.lock:
+            if mtime != self.mtime:
+                self.variants = self._load()
+                self.mtime = mtime
+            return self.variants
+    
+    def respond(self):
+        """Serve the page in the best accepted encoding, or None if unusable"""
+        variants = self.get()
+        if variants is None:
+            return None
+        
+        encoding = 'identity'
+        for candidate in ('br', 'gzip'):
+            if candidate in variants and request.accept_encodings[candidate] > 0:
+                encoding = candidate
+                break
+        body, etag = variants[encoding]
+        
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = Response(body, mimetype='text/html')
+            if encoding != 'identity':
+                response.headers['Content-Encoding'] = encoding
+        response.set_etag(etag)
+        # Always revalidate, so an updated dashboard is picked up on the next load
+        response.headers['Cache-Control'] = 'no-cache'
+        response.vary.add('Accept-Encoding')
+        return response
+
+template_cache = TemplateCache(TEMPLATE_FILE)
+
+# Request metrics
+UNPROFILED_ROUTES = frozenset(['/api/stream', '/api/admin/profiles', '/api/admin/profiles/<name>'])
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    if profiler.armed['request'] and request.url_rule is not None and request.url_rule.rule not in UNPROFILED_ROUTES:
+        g.profile = profiler.start('request', request.url_rule.rule)
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        http_request_seconds.observe(time.perf_counter() - started, route, request.method, str(response.status_code))
+        size = response.calculate_content_length()
+        if size is not None:
+            http_response_bytes.observe(size, route)
+        if response.status_code >= 500:
+            http_errors.inc(route)
+    return response
+
+@app.teardown_request
+def finish_request_profile(error=None):
+    handle = g.pop('profile', None)
+    if handle is not None:
+        profiler.finish(handle)
 
 # Routes
 @app.route('/')
 def index():
     """Serve main dashboard page"""
     try:
-        logging.info(f"Template file path: {TEMPLATE_FILE}")
-        logging.info(f"Template file exists: {TEMPLATE_FILE.exists()}")
-        
-        if TEMPLATE_FILE.exists():
-            with open(TEMPLATE_FILE, 'r', encoding='utf-8') as f:
-                content = f.read()
-                logging.info(f"Template content length: {len(content)}")
-                
-                # Check for our new version number
-                if '6.9.0-mobile-swipe' in content:
-                    logging.info("✅ New version found in template")
-                else:
-                    logging.warning("❌ Old version still in template")
-                
-                if 'showAdmin' in content and len(content) > 10000:
-                    logging.info("Serving dashboard template with cache-busting headers")
-                    # Add cache-busting headers
-                    from flask import Response
-                    response = Response(content)
-                    response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-                    response.headers['Pragma'] = 'no-cache'
-                    response.headers['Expires'] = '0'
-                    response.headers['Content-Type'] = 'text/html; charset=utf-8'
-                    return response
+        response = template_cache.respond()
+        if response is not None:
+            return response
     except Exception as e:
         logging.error("Template load error: " + str(e))
     
@@ -776,18 +3378,57 @@ def index():
 @app.route('/health')
 def health():
     """Health check endpoint"""
-    return jsonify({'status': 'healthy', 'version': VERSION})
+    snapshot = get_snapshot()
+    return jsonify({
+        'status': 'healthy',
+        'version': VERSION,
+        'poller': cache_poller.status(),
+        'refresh': refresh_coordinator.status(),
+        'snapshot': {'version': snapshot.version, 'built_at': snapshot.built_at},
+        'diagnostics': diagnostics.status(),
+        'stream_clients': snapshot_broadcaster.clients
+    })
+
+@app.route('/metrics')
+def get_metrics():
+    """Poller, upstream and request performance in the Prometheus text format"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
 
 @app.route('/api/dashboard')
 def get_dashboard_data():
-    """Get dashboard data"""
-    update_cache()
-    return jsonify(data_cache['combined'])
+    """Get dashboard data, or only what changed since ?since=<version>"""
+    snapshot = get_snapshot()
+    since = request.args.get('since', type=int)
+    if since is not None and request.args.get('epoch', SNAPSHOT_EPOCH) == SNAPSHOT_EPOCH:
+        if snapshot_deltas.delta(snapshot, since) is not None:
+            return response_cache.respond('dashboard_delta', snapshot, since)
+    return response_cache.respond('dashboard', snapshot)
+
+def dashboard_delta_payload(snapshot, since):
+    """Get the ?since= response: the delta, or the full payload if the base expired meanwhile"""
+    delta = snapshot_deltas.delta(snapshot, since)
+    return delta if delta is not None else dashboard_payload(snapshot)
+
+response_cache.register('dashboard', lambda snapshot: dashboard_payload(snapshot))
+response_cache.register('dashboard_delta', dashboard_delta_payload,
+                        key=lambda snapshot, since: since, warm=False)
+
+@app.route('/api/stream')
+def stream_dashboard():
+    """Push dashboard data to the client whenever a new snapshot is published"""
+    return Response(
+        snapshot_broadcaster.stream(),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # stop nginx from buffering the stream
+        }
+    )
 
 @app.route('/api/version')
 def get_version():
     """Get version info"""
-    config = load_config()
+    config = get_config()
     current_time = get_timezone_aware_now()
     
     return jsonify({
@@ -810,13 +3451,28 @@ def get_network_info():
         'success': True
     })
 
+def build_devices_response(snapshot):
+    """Build the /api/devices response for a snapshot"""
+    devices = snapshot.combined.get('devices', [])
+    return {
+        'devices': devices,
+        'count': len(devices)
+    }
+
 @app.route('/api/devices')
 def get_devices():
     """Get devices"""
-    return jsonify({
-        'devices': data_cache['combined'].get('devices', []),
-        'count': len(data_cache['combined'].get('devices', []))
-    })
+    return response_cache.respond('devices', get_snapshot())
+
+response_cache.register('devices', build_devices_response)
+
+@app.route('/api/devices/<mac>/history')
+def get_device_history(mac):
+    """Get presence sessions and recent signal readings for one device"""
+    history = presence_tracker.history(mac)
+    if history is None:
+        return jsonify({'success': False, 'message': 'Device not found'}), 404
+    return jsonify(history)
 
 @app.route('/api/networks')
 def get_networks():
@@ -1008,7 +3664,7 @@ def authenticate_network(network_id):
             
             logging.info(f"Sending verification code to {email} for network {network_id}")
             response = requests.post(
-                f"https://{eero_api.api_url}/2.2/pro/login",
+                eero_api.api_base + "/pro/login",
                 json={"login": email},
                 timeout=10
             )
@@ -1040,7 +3696,7 @@ def authenticate_network(network_id):
             
             # Verify code with real Eero API
             verify_response = requests.post(
-                f"https://{eero_api.api_url}/2.2/login/verify",
+                eero_api.api_base + "/login/verify",
                 headers={"X-User-Token": token, "Content-Type": "application/x-www-form-urlencoded"},
                 data={"code": code},
                 timeout=10
@@ -1081,7 +3737,7 @@ def authenticate_network(network_id):
 def get_kiosk_settings():
     """Get kiosk mode settings"""
     try:
-        config = load_config()
+        config = get_config()
         kiosk_settings = config.get('kiosk_settings', {
             'dashboard_time': 5000,  # 5 seconds default
             'capacity_time': 7000    # 7 seconds default
@@ -1669,78 +4325,97 @@ This is an automated notification from your Eero Dashboard.
         logging.error(f"Failed to send boot notification: {str(e)}")
         raise
 
+def network_config_key(snapshot):
+    """Cache key part for responses that depend on config and network tokens"""
+    get_config()  # revalidates the config file
+    return (config_provider.revision, tuple(sorted(eero_api.network_tokens)))
+
+def build_network_stats_response(snapshot):
+    """Build the /api/network-stats response for a snapshot"""
+    config = get_config()
+    networks = config.get('networks', [])
+    active_networks = [n for n in networks if n.get('active', True)]
+    
+    network_stats = []
+    
+    for network in active_networks:
+        network_id = network.get('id')
+        if not network_id or network_id not in snapshot.networks:
+            # Return basic info for unauthenticated networks
+            network_info = {
+                'id': network_id,
+                'name': network.get('name', f'Network {network_id}'),
+                'authenticated': network_id in eero_api.network_tokens,
+                'total_devices': 0,
+                'wireless_devices': 0,
+                'wired_devices': 0,
+                'device_os': {},
+                'frequency_distribution': {},
+                'last_successful_update': None,
+                'stale': False
+            }
+        else:
+            network_cache = snapshot.networks[network_id]
+            network_info = {
+                'id': network_id,
+                'name': network.get('name', f'Network {network_id}'),
+                'authenticated': network_id in eero_api.network_tokens,
+                'total_devices': network_cache.get('total_devices', 0),
+                'wireless_devices': network_cache.get('wireless_devices', 0),
+                'wired_devices': network_cache.get('wired_devices', 0),
+                'device_os': network_cache.get('device_os', {}),
+                'frequency_distribution': network_cache.get('frequency_distribution', {}),
+                'last_successful_update': network_cache.get('last_successful_update'),
+                'stale': network_cache.get('stale', False)
+            }
+        network_info['health'] = eero_api.health(network_id)
+        
+        # Add API network name if available
+        if network_info['authenticated']:
+            try:
+                api_network_info = eero_api.get_network_info(network_id)
+                if api_network_info.get('name'):
+                    network_info['api_name'] = api_network_info['name']
+            except:
+                pass
+        
+        network_stats.append(network_info)
+    
+    return {
+        'networks': network_stats,
+        'total_networks': len(network_stats),
+        'combined_stats': snapshot.combined
+    }
+
 @app.route('/api/network-stats')
 def get_network_stats():
     """Get detailed statistics for each network"""
     try:
-        config = load_config()
-        networks = config.get('networks', [])
-        active_networks = [n for n in networks if n.get('active', True)]
-        
-        network_stats = []
-        
-        for network in active_networks:
-            network_id = network.get('id')
-            if not network_id or network_id not in data_cache.get('networks', {}):
-                # Return basic info for unauthenticated networks
-                network_info = {
-                    'id': network_id,
-                    'name': network.get('name', f'Network {network_id}'),
-                    'authenticated': network_id in eero_api.network_tokens,
-                    'total_devices': 0,
-                    'wireless_devices': 0,
-                    'wired_devices': 0,
-                    'device_os': {},
-                    'frequency_distribution': {},
-                    'last_successful_update': None
-                }
-            else:
-                network_cache = data_cache['networks'][network_id]
-                network_info = {
-                    'id': network_id,
-                    'name': network.get('name', f'Network {network_id}'),
-                    'authenticated': network_id in eero_api.network_tokens,
-                    'total_devices': network_cache.get('total_devices', 0),
-                    'wireless_devices': network_cache.get('wireless_devices', 0),
-                    'wired_devices': network_cache.get('wired_devices', 0),
-                    'device_os': network_cache.get('device_os', {}),
-                    'frequency_distribution': network_cache.get('frequency_distribution', {}),
-                    'last_successful_update': network_cache.get('last_successful_update')
-                }
-            
-            # Add API network name if available
-            if network_info['authenticated']:
-                try:
-                    api_network_info = eero_api.get_network_info(network_id)
-                    if api_network_info.get('name'):
-                        network_info['api_name'] = api_network_info['name']
-                except:
-                    pass
-            
-            network_stats.append(network_info)
-        
-        return jsonify({
-            'networks': network_stats,
-            'total_networks': len(network_stats),
-            'combined_stats': data_cache.get('combined', {})
-        })
+        return response_cache.respond('network_stats', get_snapshot())
         
     except Exception as e:
         logging.error(f"Network stats error: {str(e)}")
         return jsonify({'networks': [], 'total_networks': 0, 'combined_stats': {}}), 500
 
+def network_stats_key(snapshot):
+    """Cache key part for /api/network-stats, which also shows circuit breaker state"""
+    return network_config_key(snapshot) + (eero_api.health_revision,)
+
+response_cache.register('network_stats', build_network_stats_response, key=network_stats_key)
+
 @app.route('/api/debug/signal')
 def debug_signal():
     """Debug endpoint for signal strength data"""
     try:
+        snapshot = get_snapshot()
         debug_info = {
-            'combined_signal_data': data_cache['combined'].get('signal_strength_avg', []),
-            'combined_signal_count': len(data_cache['combined'].get('signal_strength_avg', [])),
+            'combined_signal_data': snapshot.combined.get('signal_strength_avg', []),
+            'combined_signal_count': len(snapshot.combined.get('signal_strength_avg', [])),
             'networks': {}
         }
         
         # Add per-network signal data
-        for network_id, network_data in data_cache.get('networks', {}).items():
+        for network_id, network_data in snapshot.networks.items():
             debug_info['networks'][network_id] = {
                 'signal_data': network_data.get('signal_strength_avg', []),
                 'signal_count': len(network_data.get('signal_strength_avg', [])),
@@ -1752,13 +4427,43 @@ def debug_signal():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/signal/summary')
+def get_signal_summary():
+    """Get signal percentiles and quality histograms per network, band and AP"""
+    try:
+        return response_cache.respond('signal_summary', get_snapshot())
+    except Exception as e:
+        logging.error(f"Signal summary error: {str(e)}")
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+response_cache.register('signal_summary', signal_analytics.summarize)
+
 @app.route('/api/dashboard/<int:hours>')
 def get_dashboard_data_filtered(hours):
-    """Get dashboard data filtered by time range"""
-    update_cache()
-    filtered_cache = data_cache['combined'].copy()
+    """Get dashboard data with history for the last N hours"""
+    filtered_cache = get_snapshot().combined.copy()
+    if hours <= 0:
+        return jsonify(filtered_cache)
+    
+    try:
+        resolution, connected_users, signal_strength_avg = history_store.query(COMBINED_SERIES_ID, hours)
+        if connected_users:
+            filtered_cache.update({
+                'connected_users': connected_users,
+                'signal_strength_avg': signal_strength_avg,
+                'resolution_seconds': resolution
+            })
+            return jsonify(filtered_cache)
+    except Exception as e:
+        logging.error(f"History query error: {str(e)}")
     
-    # For local development, just return the same data regardless of time range
+    # No stored history yet: filter the in-memory series instead
+    cutoff = get_timezone_aware_now() - timedelta(hours=hours)
+    for key in ('connected_users', 'signal_strength_avg'):
+        filtered_cache[key] = [
+            point for point in filtered_cache.get(key, [])
+            if datetime.fromisoformat(point['timestamp']) >= cutoff
+        ]
     return jsonify(filtered_cache)
 
 @app.route('/api/admin/backup-data', methods=['POST'])
@@ -1775,13 +4480,60 @@ def backup_data():
         else:
             # Create empty backup
             with open(backup_file, 'w') as f:
-                json.dump(data_cache, f, indent=2)
+                json.dump(get_snapshot().to_dict(), f, indent=2, default=json_default)
             return jsonify({'success': True, 'message': 'Data backed up successfully (new backup)'})
             
     except Exception as e:
         logging.error(f"Backup error: {str(e)}")
         return jsonify({'success': False, 'message': f'Backup error: {str(e)}'}), 500
 
+@app.route('/api/admin/profiles', methods=['GET'])
+def get_profiles():
+    """List saved profiler captures and what is armed"""
+    try:
+        return jsonify({'success': True, 'status': profiler.status(), 'profiles': profiler.list()})
+    except Exception as e:
+        logging.error(f"Profile listing error: {str(e)}")
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@app.route('/api/admin/profiles', methods=['POST'])
+def arm_profiler():
+    """Capture the next N refresh cycles or requests (count 0 cancels)"""
+    try:
+        data = request.get_json() or {}
+        try:
+            profiler.arm(data.get('target', 'refresh'), data.get('count', 1),
+                         mode=data.get('mode', 'both'), route=data.get('route'))
+        except (TypeError, ValueError) as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+        return jsonify({'success': True, 'status': profiler.status()})
+    except Exception as e:
+        logging.error(f"Profiler arm error: {str(e)}")
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@app.route('/api/admin/profiles/<name>', methods=['GET'])
+def download_profile(name):
+    """Download a saved .pstats, .collapsed or .json capture file"""
+    path = profiler.file_path(name)
+    if path is None:
+        return jsonify({'success': False, 'message': 'Profile not found'}), 404
+    return send_from_directory(PROFILE_DIR, path.name, as_attachment=True)
+
+@app.route('/api/admin/refresh', methods=['POST'])
+def refresh_now():
+    """Trigger an immediate cache refresh (coalesced with any refresh in flight)"""
+    try:
+        outcome = refresh_coordinator.refresh()
+        return jsonify({
+            'success': outcome != 'failed',
+            'outcome': outcome,
+            'last_update': get_snapshot().combined.get('last_update'),
+            'stats': refresh_coordinator.status()
+        })
+    except Exception as e:
+        logging.error("Manual refresh error: " + str(e))
+        return jsonify({'success': False, 'message': str(e)}), 500
+
 @app.route('/api/admin/update', methods=['POST'])
 def update_dashboard():
     """Update dashboard from GitHub - local development version"""
@@ -1844,7 +4596,7 @@ def reauthorize():
             
             logging.info("Sending verification code to " + email)
             response = requests.post(
-                "https://" + eero_api.api_url + "/2.2/pro/login",
+                eero_api.api_base + "/pro/login",
                 json={"login": email},
                 timeout=10
             )
@@ -1881,14 +4633,14 @@ def reauthorize():
             verify_methods = [
                 # Method 1: Form data (original eero API format)
                 lambda: requests.post(
-                    "https://" + eero_api.api_url + "/2.2/login/verify",
+                    eero_api.api_base + "/login/verify",
                     headers={"X-User-Token": token, "Content-Type": "application/x-www-form-urlencoded"},
                     data={"code": code},
                     timeout=10
                 ),
                 # Method 2: JSON data
                 lambda: requests.post(
-                    "https://" + eero_api.api_url + "/2.2/login/verify",
+                    eero_api.api_base + "/login/verify",
                     headers={"X-User-Token": token, "Content-Type": "application/json"},
                     json={"code": code},
                     timeout=10
@@ -1955,8 +4707,8 @@ def reauthorize():
 def get_voice_status():
     """Get network status optimized for voice responses"""
     try:
-        update_cache()
-        combined_data = data_cache['combined']
+        snapshot = get_snapshot()
+        combined_data = snapshot.combined
         
         total_devices = combined_data.get('total_devices', 0)
         wireless_devices = combined_data.get('wireless_devices', 0)
@@ -1968,7 +4720,7 @@ def get_voice_status():
         busiest_ap = None
         max_devices = 0
         
-        for network_id, network_data in data_cache.get('networks', {}).items():
+        for network_id, network_data in snapshot.networks.items():
             ap_data = network_data.get('ap_data', {})
             for ap_id, ap_info in ap_data.items():
                 total_aps += 1
@@ -2009,8 +4761,8 @@ def get_voice_status():
 def get_voice_devices():
     """Get device information optimized for voice responses"""
     try:
-        update_cache()
-        combined_data = data_cache['combined']
+        snapshot = get_snapshot()
+        combined_data = snapshot.combined
         
         total_devices = combined_data.get('total_devices', 0)
         wireless_devices = combined_data.get('wireless_devices', 0)
@@ -2021,7 +4773,7 @@ def get_voice_devices():
         busiest_ap = None
         max_devices = 0
         
-        for network_id, network_data in data_cache.get('networks', {}).items():
+        for network_id, network_data in snapshot.networks.items():
             ap_data = network_data.get('ap_data', {})
             for ap_id, ap_info in ap_data.items():
                 if ap_info.get('total_devices', 0) > max_devices:
@@ -2055,13 +4807,12 @@ def get_voice_devices():
 def get_voice_aps():
     """Get access point information optimized for voice responses"""
     try:
-        update_cache()
-        
+        snapshot = get_snapshot()
         total_aps = 0
         busiest_ap = None
         max_devices = 0
         
-        for network_id, network_data in data_cache.get('networks', {}).items():
+        for network_id, network_data in snapshot.networks.items():
             ap_data = network_data.get('ap_data', {})
             for ap_id, ap_info in ap_data.items():
                 total_aps += 1
@@ -2078,7 +4829,7 @@ def get_voice_aps():
             'total_aps': total_aps,
             'online_aps': total_aps,  # All APs in data are considered online
             'busiest_ap': busiest_ap,
-            'last_update': data_cache['combined'].get('last_update')
+            'last_update': snapshot.combined.get('last_update')
         })
         
     except Exception as e:
@@ -2094,31 +4845,14 @@ def get_voice_aps():
 def get_voice_events():
     """Get recent network events optimized for voice responses"""
     try:
-        # For now, return mock events since we don't have real event tracking
-        # This can be enhanced later with actual event monitoring
-        current_time = get_timezone_aware_now()
-        
-        # Generate some sample events based on current device data
-        events = []
-        combined_data = data_cache['combined']
-        devices = combined_data.get('devices', [])
-        
-        # Create mock recent events for voice responses
-        if devices:
-            # Take first few devices as "recently connected"
-            for i, device in enumerate(devices[:3]):
-                event_time = current_time - timedelta(minutes=i*15)
-                events.append({
-                    'type': 'device_connected',
-                    'device_name': device.get('name', 'Unknown Device'),
-                    'timestamp': event_time.isoformat(),
-                    'description': f"{device.get('name', 'Unknown Device')} connected"
-                })
+        limit = max(1, min(100, request.args.get('limit', 10, type=int)))
+        event_types = [t for t in request.args.get('types', '').split(',') if t]
+        events = event_engine.recent(limit, event_types)
         
         return jsonify({
             'events': events,
             'event_count': len(events),
-            'last_update': combined_data.get('last_update')
+            'last_update': get_snapshot().combined.get('last_update')
         })
         
     except Exception as e:
@@ -2137,7 +4871,7 @@ def export_csv():
         from io import StringIO
         
         # Get current network stats
-        config = load_config()
+        config = get_config()
         networks = config.get('networks', [])
         
         # Create CSV content
@@ -2155,9 +4889,10 @@ def export_csv():
         ])
         
         # Write network data
+        snapshot = get_snapshot()
         for network in networks:
             network_id = network.get('id')
-            network_cache = data_cache.get('networks', {}).get(network_id, {})
+            network_cache = snapshot.networks.get(network_id, {})
             device_os = network_cache.get('device_os', {})
             freq_dist = network_cache.get('frequency_distribution', {})
             
@@ -2204,32 +4939,38 @@ def export_csv():
         logging.error(f"CSV export error: {str(e)}")
         return jsonify({'error': 'Failed to generate CSV export'}), 500
 
+def build_ap_data_response(snapshot):
+    """Build the /api/ap-data response for a snapshot"""
+    config = get_config()
+    networks = config.get('networks', [])
+    active_networks = [n for n in networks if n.get('active', True)]
+    
+    ap_data_by_network = {}
+    
+    for network in active_networks:
+        network_id = network.get('id')
+        if network_id in snapshot.networks:
+            network_cache = snapshot.networks[network_id]
+            ap_data_by_network[network_id] = {
+                'network_name': network.get('name', f'Network {network_id}'),
+                'ap_data': network_cache.get('ap_data', {}),
+                'authenticated': network_id in eero_api.network_tokens
+            }
+    
+    return {'networks': ap_data_by_network}
+
 @app.route('/api/ap-data')
 def get_ap_data():
     """Get AP (Access Point) data for all networks"""
     try:
-        config = load_config()
-        networks = config.get('networks', [])
-        active_networks = [n for n in networks if n.get('active', True)]
-        
-        ap_data_by_network = {}
-        
-        for network in active_networks:
-            network_id = network.get('id')
-            if network_id in data_cache.get('networks', {}):
-                network_cache = data_cache['networks'][network_id]
-                ap_data_by_network[network_id] = {
-                    'network_name': network.get('name', f'Network {network_id}'),
-                    'ap_data': network_cache.get('ap_data', {}),
-                    'authenticated': network_id in eero_api.network_tokens
-                }
-        
-        return jsonify({'networks': ap_data_by_network})
+        return response_cache.respond('ap_data', get_snapshot())
         
     except Exception as e:
         logging.error(f"AP data error: {str(e)}")
         return jsonify({'networks': {}}), 500
 
+response_cache.register('ap_data', build_ap_data_response, key=network_config_key)
+
 def create_default_config():
     """Create default configuration if it doesn't exist"""
     if not CONFIG_FILE.exists():
@@ -2339,12 +5080,16 @@ if __name__ == '__main__':
     
     print(f"🌐 Dashboard: {'https' if ssl_context else 'http'}://{bind_host if bind_host != '0.0.0.0' else 'localhost'}:{port}")
     
-    # Initial cache update
-    try:
-        update_cache()
-        logging.info("Initial cache update complete")
-    except Exception as e:
-        logging.warning("Initial cache update failed: " + str(e))
+    # Serve the last persisted state (marked stale) until the first refresh lands
+    snapshot_persister.restore()
+    
+    # Refresh the cache in the background; the first cycle runs immediately
+    cache_poller.start()
+    
+    # systemd stops the service with SIGTERM: exit normally so the shutdown
+    # below still persists the snapshot
+    import signal as process_signals
+    process_signals.signal(process_signals.SIGTERM, lambda signum, frame: sys.exit(0))
     
     # Start Flask app optimized for Pi
     try:
@@ -2367,4 +5112,8 @@ if __name__ == '__main__':
     except Exception as e:
         logging.error(f"Failed to start dashboard: {e}")
         print(f"\n❌ Error: {e}")
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
+    finally:
+        cache_poller.stop()
+        snapshot_persister.persist()
+        history_store.close()
\ No newline at end of file
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Synthetic eero API payloads for the Eero Dashboard
+Generates realistic /networks/<id>/devices and /networks/<id>/eeros responses
+at any scale, for benchmarks and the mock API server
+"""
+
+import json
+import random
+import zlib
+
+DEFAULT_BAND_MIX = {'2.4GHz': 0.3, '5GHz': 0.55, '6GHz': 0.15}
+
+# How a wireless device reports the AP it is connected to
+DEFAULT_SOURCE_MIX = {
+    'source': 0.5,          # 'source' with the AP's location and URL
+    'source_location': 0.1, # 'source' with only a location
+    'eero_url': 0.1,        # interface.eero_url
+    'bssid': 0.2,           # interface.bssid, in either case
+    'none': 0.1             # nothing usable
+}
+
+FREQUENCIES = {
+    '2.4GHz': ['2.412', '2.437', '2.462'],
+    '5GHz': ['5.18', '5.22', '5.745', '5.805'],
+    '6GHz': ['6.035', '6.135', '6.295']
+}
+
+LOCATIONS = ['Living Room', 'Kitchen', 'Office', 'Lobby', 'Bedroom', 'Basement', 'Garage', 'Hallway',
+             'Conference Room', 'Break Room', 'Reception', 'Warehouse', 'Patio', 'Studio', 'Library']
+
+AP_MODELS = ['eero Pro 6E', 'eero Pro 6', 'eero Max 7', 'eero Pro 7', 'eero 6+', 'eero Beacon']
+
+DEVICE_PROFILES = [
+    # (manufacturer, hostname prefix, weight)
+    ('Apple, Inc.', 'iPhone', 20),
+    ('Apple, Inc.', 'MacBook-Pro', 6),
+    ('Apple, Inc.', 'iPad', 5),
+    ('Samsung Electronics Co.,Ltd', 'Galaxy-S23', 10),
+    ('Google, Inc.', 'Pixel-8', 5),
+    ('Amazon Technologies Inc.', 'echo-dot', 8),
+    ('Amazon Technologies Inc.', 'fire-tv-stick', 3),
+    ('Microsoft Corporation', 'DESKTOP', 4),
+    ('Dell Inc.', 'LAPTOP', 5),
+    ('Hewlett Packard', 'HP-LaserJet', 2),
+    ('Sony Interactive Entertainment', 'PS5', 2),
+    ('Nintendo Co.,Ltd', 'Switch', 2),
+    ('Roku, Inc.', 'Roku-Ultra', 3),
+    ('Espressif Inc.', 'ESP_', 8),
+    ('Raspberry Pi Trading Ltd', 'raspberrypi', 2),
+    (None, None, 5)
+]
+
+def _weighted(rng, mix):
+    """Pick a key from a {key: weight} dict"""
+    keys = list(mix)
+    return rng.choices(keys, weights=[mix[key] for key in keys])[0]
+
+def _mac(prefix, index):
+    return f"{prefix}:{index >> 16 & 0xff:02x}:{index >> 8 & 0xff:02x}:{index & 0xff:02x}"
+
+def generate_eeros(network_id, aps=8, gateway=True, seed=0):
+    """Generate a network's /eeros payload list"""
+    rng = random.Random(f"eeros-{network_id}-{seed}")
+    base = int(network_id) if str(network_id).isdigit() else zlib.crc32(str(network_id).encode()) % 10 ** 7
+    eeros = []
+    for i in range(aps):
+        location = LOCATIONS[i % len(LOCATIONS)] + (f" {i // len(LOCATIONS) + 1}" if i >= len(LOCATIONS) else '')
+        eeros.append({
+            'url': f"/2.2/eeros/{base * 1000 + i}",
+            'serial': f"GGC{base % 10000:04d}{i:05d}",
+            'model': rng.choice(AP_MODELS),
+            'nickname': '' if rng.random() < 0.8 else f"AP {i}",
+            # Newer API versions nest the location name
+            'location': location if rng.random() < 0.7 else {'name': location},
+            'status': 'green',
+            'bssids_with_bands': [
+                {'band': band, 'ethernet_address': _mac(f"a4:d8:{i >> 8 & 0xff:02x}", i * 4 + k)}
+                for k, band in enumerate(['band_2_4GHz', 'band_5GHz', 'band_6GHz'])
+            ]
+        })
+    if gateway:
+        eeros.append({
+            'url': f"/2.2/eeros/{base * 1000 + aps}",
+            'serial': f"GGC{base % 10000:04d}GW",
+            'model': 'eero PoE Gateway',
+            'nickname': '',
+            'location': 'Network Closet',
+            'bssids_with_bands': []
+        })
+    return eeros
+
+def generate_devices(network_id, eeros, devices=200, connected_ratio=0.9, wireless_ratio=0.85,
+                     band_mix=DEFAULT_BAND_MIX, source_mix=DEFAULT_SOURCE_MIX, seed=0):
+    """Generate a network's /devices payload list for the given eeros"""
+    rng = random.Random(f"devices-{network_id}-{seed}")
+    aps = [eero for eero in eeros if 'gateway' not in eero.get('model', '').lower()]
+    profiles = [profile[:2] for profile in DEVICE_PROFILES]
+    weights = [profile[2] for profile in DEVICE_PROFILES]
+    network_index = zlib.crc32(str(network_id).encode()) % 256
+    payload = []
+    for i in range(devices):
+        manufacturer, prefix = rng.choices(profiles, weights=weights)[0]
+        mac = _mac(f"02:00:{network_index:02x}", i)
+        device = {
+            'url': f"/2.2/networks/{network_id}/devices/{mac.replace(':', '')}",
+            'mac': mac,
+            'manufacturer': manufacturer,
+            'hostname': f"{prefix}-{i:04d}" if prefix else None,
+            'nickname': f"Device {i}" if rng.random() < 0.1 else None,
+            'ip': f"192.168.{i >> 8 & 0xff}.{i & 0xff}",
+            'ips': [f"192.168.{i >> 8 & 0xff}.{i & 0xff}"] + ([f"fe80::{i:x}"] if rng.random() < 0.1 else []),
+            'connected': rng.random() < connected_ratio,
+            'wireless': bool(aps) and rng.random() < wireless_ratio
+        }
+        if device['wireless']:
+            band = _weighted(rng, band_mix)
+            ap = rng.choice(aps)
+            location = ap['location']['name'] if isinstance(ap['location'], dict) else ap['location']
+            signal = rng.randint(-88, -38)
+            interface = {
+                'frequency': rng.choice(FREQUENCIES[band]),
+                'frequency_unit': 'GHz',
+                # The API reports numbers, occasionally strings
+                'signal_dbm': signal if rng.random() < 0.9 else str(signal)
+            }
+            shape = _weighted(rng, source_mix)
+            if shape == 'source':
+                device['source'] = {'location': location, 'url': ap['url']}
+            elif shape == 'source_location':
+                device['source'] = {'location': location}
+            elif shape == 'eero_url':
+                interface['eero_url'] = ap['url']
+            elif shape == 'bssid':
+                bssids = ap['bssids_with_bands']
+                bssid = bssids[min(len(bssids) - 1, ['2.4GHz', '5GHz', '6GHz'].index(band))]['ethernet_address']
+                interface['bssid'] = bssid.upper() if rng.random() < 0.5 else bssid
+            device['interface'] = interface
+        else:
+            device['connection_type'] = 'wired'
+        payload.append(device)
+    return payload
+
+def generate_fixtures(networks=1, devices=200, aps=8, seed=0, **options):
+    """Generate payloads for several networks: {network_id: {'devices': [...], 'eeros': [...]}}
+
+    options are passed to generate_devices() (connected_ratio, wireless_ratio,
+    band_mix, source_mix).
+    """
+    fixtures = {}
+    for n in range(networks):
+        network_id = str(20000000 + n)
+        eeros = generate_eeros(network_id, aps=aps, seed=seed)
+        fixtures[network_id] = {
+            'devices': generate_devices(network_id, eeros, devices=devices, seed=seed, **options),
+            'eeros': eeros
+        }
+    return fixtures
+
+def api_response(data):
+    """Wrap a payload the way the eero API does"""
+    return {'meta': {'code': 200, 'server_time': None}, 'data': data}
+
+class FixtureResponse:
+    """Just enough of requests.Response for EeroAPI"""
+
+    def __init__(self, data, status_code=200):
+        self.status_code = status_code
+        self.headers = {}
+        self._body = json.dumps(data)  # serialize once, like a real response body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            import requests
+            raise requests.HTTPError(f"{self.status_code} Error", response=self)
+
+    def json(self):
+        return json.loads(self._body)
+
+class FixtureSession:
+    """Stand-in for EeroAPI.session serving generated payloads"""
+
+    def __init__(self, fixtures):
+        self.fixtures = fixtures
+        self.calls = 0
+
+    def get(self, url, headers=None, timeout=None, **kwargs):
+        self.calls += 1
+        parts = url.rstrip('/').split('/')
+        try:
+            network_id, resource = parts[parts.index('networks') + 1], parts[-1]
+            return FixtureResponse(api_response(self.fixtures[network_id][resource]))
+        except (ValueError, KeyError):
+            return FixtureResponse({'meta': {'code': 404, 'error': 'not found'}}, status_code=404)
+
+if __name__ == '__main__':
+    # Print a small sample payload
+    sample = generate_fixtures(networks=1, devices=3, aps=2)
+    print(json.dumps(sample, indent=2))
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Mock eero API server for the Eero Dashboard
+Serves synthetic devices and eeros (see eero_fixtures.py) and the login flow,
+with configurable latency and 5xx, timeout and 429 injection, so polling and
+request latency can be measured offline and reproducibly.
+
+Point the dashboard at it by setting "api_url" in config.json to the URL
+printed on startup, e.g. "http://127.0.0.1:8765". Injection settings can be
+changed while it runs through GET/POST /mock/settings; /mock/stats counts
+what was served.
+"""
+
+import json
+import time
+import random
+import secrets
+import argparse
+import threading
+
+from flask import Flask, Response, request
+
+import eero_fixtures
+
+LATENCY_DISTRIBUTIONS = ('fixed', 'uniform', 'normal', 'exponential')
+
+DEFAULT_SETTINGS = {
+    'latency_ms': 50,            # typical latency
+    'latency_jitter_ms': 20,     # spread: uniform ± jitter, or normal stddev
+    'latency_distribution': 'normal',
+    'error_rate': 0.0,           # fraction of responses that are 5xx
+    'timeout_rate': 0.0,         # fraction of responses that hang
+    'timeout_seconds': 20,       # how long a hung response takes (EeroAPI gives up after 15s)
+    'throttle_rate': 0.0,        # fraction of responses that are 429
+    'retry_after_seconds': 30,
+    'require_token': True,       # devices/eeros need an X-User-Token header
+    'verify_code': '123456',     # the only accepted code; empty accepts any code
+    'networks': {}               # per-network overrides of the settings above
+}
+
+class MockSettings:
+    """Injection settings, changeable at runtime"""
+
+    def __init__(self, settings=None, seed=None):
+        self.lock = threading.Lock()
+        self.values = dict(DEFAULT_SETTINGS)
+        self.rng = random.Random(seed)
+        if settings:
+            self.update(settings)
+
+    def update(self, settings):
+        """Apply known keys from settings, rejecting invalid values with ValueError"""
+        with self.lock:
+            values = dict(self.values)
+            for key, value in settings.items():
+                if key not in DEFAULT_SETTINGS:
+                    raise ValueError(f"unknown setting {key!r}")
+                if key == 'latency_distribution' and value not in LATENCY_DISTRIBUTIONS:
+                    raise ValueError(f"latency_distribution must be one of {', '.join(LATENCY_DISTRIBUTIONS)}")
+                if key == 'networks' and not isinstance(value, dict):
+                    raise ValueError("networks must map network ids to settings")
+                if key.endswith('_rate') and not 0 <= float(value) <= 1:
+                    raise ValueError(f"{key} must be between 0 and 1")
+                values[key] = value
+            self.values = values
+
+    def get(self):
+        with self.lock:
+            return dict(self.values)
+
+    def for_network(self, network_id):
+        """Get settings with the network's overrides applied"""
+        values = self.get()
+        values.update(values['networks'].get(network_id, {}))
+        return values
+
+    def latency(self, values):
+        """Sample a response delay in seconds"""
+        base = max(0.0, float(values['latency_ms']))
+        jitter = max(0.0, float(values['latency_jitter_ms']))
+        distribution = values['latency_distribution']
+        with self.lock:
+            if distribution == 'uniform':
+                delay = self.rng.uniform(base - jitter, base + jitter)
+            elif distribution == 'normal':
+                delay = self.rng.gauss(base, jitter)
+            elif distribution == 'exponential':
+                delay = self.rng.expovariate(1 / base) if base else 0.0
+            else:
+                delay = base
+        return max(0.0, delay) / 1000
+
+    def outcome(self, values):
+        """Pick 'timeout', 'error', 'throttle' or 'ok' for one response"""
+        with self.lock:
+            roll = self.rng.random()
+        for outcome in ('timeout', 'error', 'throttle'):
+            rate = float(values[f'{outcome}_rate'])
+            if roll < rate:
+                return outcome
+            roll -= rate
+        return 'ok'
+
+    def error_code(self):
+        """Pick the status of an injected server error"""
+        with self.lock:
+            return self.rng.choice((500, 502, 503))
+
+class MockStats:
+    """Counts of served responses per endpoint and outcome"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.counts = {}
+
+    def record(self, endpoint, outcome):
+        with self.lock:
+            key = f"{endpoint} {outcome}"
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def to_dict(self):
+        with self.lock:
+            return {'uptime_seconds': round(time.time() - self.started), 'responses': dict(self.counts)}
+
+class FixtureStore:
+    """Generated payloads per network id, serialized once
+
+    Any network id gets payloads on first request, so the dashboard's
+    configured networks work as they are.
+    """
+
+    def __init__(self, devices=200, aps=8, seed=0, **options):
+        self.devices = devices
+        self.aps = aps
+        self.seed = seed
+        self.options = options
+        self.lock = threading.Lock()
+        self.bodies = {}  # (network_id, resource) -> JSON body
+
+    def body(self, network_id, resource):
+        key = (network_id, resource)
+        with self.lock:
+            if key not in self.bodies:
+                eeros = eero_fixtures.generate_eeros(network_id, aps=self.aps, seed=self.seed)
+                devices = eero_fixtures.generate_devices(network_id, eeros, devices=self.devices,
+                                                         seed=self.seed, **self.options)
+                self.bodies[(network_id, 'eeros')] = json.dumps(eero_fixtures.api_response(eeros))
+                self.bodies[(network_id, 'devices')] = json.dumps(eero_fixtures.api_response(devices))
+            return self.bodies[key]
+
+def error_response(code, message, headers=None):
+    body = json.dumps({'meta': {'code': code, 'error': message}})
+    return Response(body, status=code, mimetype='application/json', headers=headers)
+
+def create_app(store, settings, stats=None):
+    """Build the mock API app"""
+    stats = stats or MockStats()
+    app = Flask(__name__)
+
+    def inject(endpoint, network_id=None):
+        """Delay the response and maybe replace it with an injected failure"""
+        values = settings.for_network(network_id) if network_id else settings.get()
+        time.sleep(settings.latency(values))
+        outcome = settings.outcome(values)
+        stats.record(endpoint, outcome)
+        if outcome == 'timeout':
+            time.sleep(float(values['timeout_seconds']))
+            return error_response(504, 'gateway timeout')
+        if outcome == 'error':
+            return error_response(settings.error_code(), 'injected server error')
+        if outcome == 'throttle':
+            return error_response(429, 'too many requests',
+                                  headers={'Retry-After': str(values['retry_after_seconds'])})
+        return None
+
+    @app.route('/2.2/networks/<network_id>/<resource>', methods=['GET'])
+    def network_resource(network_id, resource):
+        if resource not in ('devices', 'eeros'):
+            return error_response(404, 'not found')
+        if settings.get()['require_token'] and not request.headers.get('X-User-Token'):
+            stats.record(resource, 'unauthorized')
+            return error_response(401, 'error.session.invalid')
+        failure = inject(resource, network_id)
+        if failure is not None:
+            return failure
+        return Response(store.body(network_id, resource), mimetype='application/json')
+
+    @app.route('/2.2/pro/login', methods=['POST'])
+    def login():
+        failure = inject('login')
+        if failure is not None:
+            return failure
+        data = request.get_json(silent=True) or {}
+        if '@' not in str(data.get('login', '')):
+            return error_response(400, 'error.login.invalid')
+        return Response(json.dumps(eero_fixtures.api_response({'user_token': f"mock-{secrets.token_hex(16)}"})),
+                        mimetype='application/json')
+
+    @app.route('/2.2/login/verify', methods=['POST'])
+    def verify():
+        failure = inject('verify')
+        if failure is not None:
+            return failure
+        if not request.headers.get('X-User-Token'):
+            return error_response(401, 'error.session.invalid')
+        code = request.form.get('code') or (request.get_json(silent=True) or {}).get('code', '')
+        expected = settings.get()['verify_code']
+        if expected and str(code).strip() != str(expected):
+            return error_response(401, 'error.verification.invalid')
+        return Response(json.dumps(eero_fixtures.api_response({'email': {'verified': True}, 'verified': True})),
+                        mimetype='application/json')
+
+    @app.route('/mock/settings', methods=['GET', 'POST'])
+    def mock_settings():
+        if request.method == 'POST':
+            try:
+                settings.update(request.get_json(silent=True) or {})
+            except (TypeError, ValueError) as e:
+                return error_response(400, str(e))
+        return Response(json.dumps(settings.get()), mimetype='application/json')
+
+    @app.route('/mock/stats', methods=['GET'])
+    def mock_stats():
+        return Response(json.dumps(stats.to_dict()), mimetype='application/json')
+
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock eero API server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--devices', type=int, default=200, help="devices per network")
+    parser.add_argument('--aps', type=int, default=8, help="eeros per network, plus a gateway")
+    parser.add_argument('--wireless-ratio', type=float, default=0.85)
+    parser.add_argument('--connected-ratio', type=float, default=0.9)
+    parser.add_argument('--seed', type=int, default=0, help="seed for payloads and injected failures")
+    parser.add_argument('--latency-ms', type=float, default=DEFAULT_SETTINGS['latency_ms'])
+    parser.add_argument('--latency-jitter-ms', type=float, default=DEFAULT_SETTINGS['latency_jitter_ms'])
+    parser.add_argument('--latency-distribution', choices=LATENCY_DISTRIBUTIONS,
+                        default=DEFAULT_SETTINGS['latency_distribution'])
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of 5xx responses")
+    parser.add_argument('--timeout-rate', type=float, default=0.0, help="fraction of hung responses")
+    parser.add_argument('--timeout-seconds', type=float, default=DEFAULT_SETTINGS['timeout_seconds'])
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help="fraction of 429 responses")
+    parser.add_argument('--verify-code', default=DEFAULT_SETTINGS['verify_code'],
+                        help="verification code to accept (empty accepts any)")
+    parser.add_argument('--settings', help="JSON file with settings, including per-network overrides")
+    args = parser.parse_args()
+
+    values = {
+        'latency_ms': args.latency_ms,
+        'latency_jitter_ms': args.latency_jitter_ms,
+        'latency_distribution': args.latency_distribution,
+        'error_rate': args.error_rate,
+        'timeout_rate': args.timeout_rate,
+        'timeout_seconds': args.timeout_seconds,
+        'throttle_rate': args.throttle_rate,
+        'verify_code': args.verify_code
+    }
+    if args.settings:
+        with open(args.settings) as f:
+            values.update(json.load(f))
+
+    settings = MockSettings(values, seed=args.seed)
+    store = FixtureStore(devices=args.devices, aps=args.aps, seed=args.seed,
+                         wireless_ratio=args.wireless_ratio, connected_ratio=args.connected_ratio)
+    app = create_app(store, settings)
+
+    print(f"🧪 Mock eero API: {args.devices} devices and {args.aps} eeros per network")
+    print(f"   Set \"api_url\": \"http://{args.host}:{args.port}\" in config.json and restart the dashboard")
+    app.run(host=args.host, port=args.port, threaded=True)
+
+if __name__ == '__main__':
+    main()
@@ -101,6 +101,103 @@ def test_web_server():
         print(f"❌ Web server test failed: {str(e)}")
         return False
 
+def test_stream_idle():
+    """Test that an SSE stream waits quietly until the first snapshot"""
+    print("\nTesting dashboard stream before the first snapshot...")
+    import threading
+    import dashboard
+    
+    if dashboard.get_snapshot().version > 0:
+        print("⚠️  A snapshot is already published, skipping")
+        return True
+    
+    stream = dashboard.SnapshotBroadcaster().stream()
+    next(stream)  # retry interval
+    next(stream)  # first keepalive
+    produced = threading.Event()
+    threading.Thread(target=lambda: (next(stream), produced.set()), daemon=True).start()
+    if produced.wait(0.5):
+        print("❌ Stream keeps sending without a snapshot (busy loop)")
+        return False
+    print("✅ Stream blocks until a snapshot is published")
+    return True
+
+def test_device_os_classifier():
+    """Test that the compiled OS classifier matches the original detect_device_os()"""
+    print("\nTesting device OS classification...")
+    import dashboard
+    import benchmark
+    
+    words = benchmark.OS_SAMPLE_WORDS + [None]
+    devices = benchmark.make_os_devices(2000)
+    devices += [{'manufacturer': m, 'hostname': h} for m in words for h in words]
+    
+    classifier = dashboard.DeviceOSClassifier()
+    mismatches = []
+    for device in devices:
+        compiled = classifier.classify(str(device.get('manufacturer', '')).lower(),
+                                       str(device.get('hostname', '')).lower())
+        if compiled != benchmark.legacy_detect_device_os(device):
+            mismatches.append(device)
+    
+    if mismatches:
+        print(f"❌ {len(mismatches)} of {len(devices)} devices classified differently, e.g. {mismatches[0]}")
+        return False
+    print(f"✅ {len(devices)} devices classified the same as before")
+    return True
+
+def test_update_cache_all_failed():
+    """Test that a cold start where every network fails publishes a stale snapshot"""
+    print("\nTesting a first refresh where every network fails...")
+    import dashboard
+    
+    if dashboard.get_snapshot().version > 0:
+        print("⚠️  A snapshot is already published, skipping")
+        return True
+    
+    class FailingSession:
+        def get(self, url, **kwargs):
+            raise requests.ConnectionError("eero API unreachable")
+    
+    # Use a test network instead of config.json, and leave out the
+    # listeners that write to the config directory
+    provider = dashboard.config_provider
+    saved = (dashboard.eero_api.session, dict(dashboard.eero_api.network_tokens),
+             provider.reader, list(dashboard._snapshot_listeners))
+    persistent = {dashboard.snapshot_persister.on_snapshot, dashboard.history_store.on_snapshot}
+    try:
+        dashboard.eero_api.session = FailingSession()
+        dashboard.eero_api.network_tokens['20000000'] = 'test'
+        provider.reader = lambda: {
+            'networks': [{'id': '20000000', 'name': 'Test Network', 'active': True}],
+            'upstream': {'retries': 0},
+            'timezone': 'America/New_York'
+        }
+        provider.signature = False
+        dashboard._snapshot_listeners[:] = [listener for listener in dashboard._snapshot_listeners
+                                            if listener not in persistent]
+        dashboard.update_cache()
+        snapshot = dashboard.get_snapshot()
+    finally:
+        dashboard.eero_api.session, tokens, provider.reader, listeners = saved
+        dashboard.eero_api.network_tokens.clear()
+        dashboard.eero_api.network_tokens.update(tokens)
+        dashboard._snapshot_listeners[:] = listeners
+        provider.signature = False
+    
+    combined = snapshot.combined
+    if not combined.get('stale') or dashboard.snapshot_is_fresh(snapshot):
+        print("❌ Snapshot with no refreshed network is not marked stale")
+        return False
+    if combined.get('connected_users') or combined.get('last_successful_update'):
+        print("❌ Snapshot with no refreshed network recorded history")
+        return False
+    if dashboard.event_engine.previous is not None:
+        print("❌ Event engine took the empty snapshot as its baseline")
+        return False
+    print("✅ Snapshot is marked stale and records no history")
+    return True
+
 def main():
     """Run all tests"""
     print("🧪 Eero Dashboard Installation Test")
@@ -111,7 +208,10 @@ def main():
         ("Dependencies", test_dependencies), 
         ("Configuration", test_configuration),
         ("Systemd Service", test_service),
-        ("Web Server", test_web_server)
+        ("Web Server", test_web_server),
+        ("Device OS Classifier", test_device_os_classifier),
+        ("Dashboard Stream", test_stream_idle),
+        ("Failed First Refresh", test_update_cache_all_failed)
     ]
     
     results = []